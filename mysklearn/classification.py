@@ -1,4 +1,81 @@
+import copy
+import json
+import multiprocessing
+import os
+from multiprocessing import shared_memory
 from mysklearn import myutils
+from mysklearn.mypytable import MyPyTable
+from mysklearn.myneighbors import MyKDTree, MyBallTree, MyLSHIndex, MyHammingEncoder, \
+    MyGowerEncoder, leaf_squared_distances, _json_value
+import numpy as np
+
+# memory budget (bytes) for one block of test-to-train distances in kneighbors()
+KNEIGHBORS_BLOCK_BYTES = 2**25
+# algorithm="auto" only builds a tree index up to this many features
+AUTO_TREE_MAX_FEATURES = 15
+# relative slack within which vectorized squared distances count as a near-tie
+NEAR_TIE_TOLERANCE = 1e-9
+
+KNEIGHBORS_ALGORITHMS = ("auto", "brute", "kd_tree", "ball_tree", "lsh")
+KNEIGHBORS_METRICS = ("euclidean", "hamming", "gower")
+KNEIGHBORS_WEIGHTS = ("uniform", "distance")
+# partial_fit() rebuilds a tree once its unindexed instances exceed this fraction of it
+TREE_REBUILD_FRACTION = 0.25
+KNN_FORMAT_VERSION = 1
+# with n_jobs, X_test is cut into this many chunks per worker to even out the load
+CHUNKS_PER_JOB = 4
+
+# the classifier rebuilt in each pool worker by _init_kneighbors_worker()
+_worker_classifier = None
+_worker_memory = []
+
+def _share_array(array):
+    """Copies an array into a new shared memory block.
+
+    Returns:
+        SharedMemory: the block (the caller closes and unlinks it)
+        tuple: (block name, shape, dtype) for attaching to it in another process
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach_array(spec):
+    """Maps an array published by _share_array() into this process (read-only).
+    """
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    # keep the mapping alive for as long as the worker runs
+    _worker_memory.append(block)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+def _init_kneighbors_worker(classifier, specs):
+    """Pool initializer: reattaches the shared training data to a fitted classifier.
+
+    Args:
+        classifier(MyKNeighborsClassifier): the classifier without its training arrays
+        specs(dict of str: tuple): shared memory specs of those arrays
+    """
+    global _worker_classifier
+    if "X" in specs:
+        X_train = _attach_array(specs["X"])
+        classifier.X_train = X_train
+        classifier._X_train_array = X_train
+        if classifier.tree is not None:
+            classifier.tree.X = X_train
+            classifier.tree._sorted_X = _attach_array(specs["sorted_X"])
+    if "lsh" in specs:
+        classifier.lsh.orders, classifier.lsh.sorted_keys = (_attach_array(spec) for spec in specs["lsh"])
+    if "encoded" in specs:
+        classifier.encoder.train = tuple(_attach_array(spec) for spec in specs["encoded"])
+    _worker_classifier = classifier
+
+def _kneighbors_worker(X_chunk):
+    """Pool task: runs kneighbors() on one chunk of test instances.
+    """
+    return _worker_classifier.kneighbors(X_chunk)
 
 class MyKNeighborsClassifier:
     """Represents a simple k nearest neighbors classifier.
@@ -9,20 +86,86 @@ class MyKNeighborsClassifier:
                 The shape of X_train is (n_train_samples, n_features)
         y_train(list of obj): The target y values (parallel to X_train).
             The shape of y_train is n_samples
+        algorithm(str): how neighbors are searched: "brute", "kd_tree", "ball_tree",
+            "lsh" or "auto"
+        leaf_size(int): largest number of training instances in a tree leaf
+        n_tables(int): number of LSH hash tables (algorithm="lsh")
+        n_projections(int): projections per LSH hash table (algorithm="lsh")
+        bucket_width(float): LSH bucket width (None to estimate it in fit())
+        random_state(int): seed for the LSH projections
+        metric(str): "euclidean", "hamming" or "gower"
+        categorical_features(list of int): categorical feature indexes for "gower"
+        weights(str): "uniform" (one vote per neighbor) or "distance" (votes weighted
+            by inverse distance)
+        classes(list of obj): the distinct labels of y_train, sorted (the column
+            order of predict_proba())
+        tree(MyBinaryTree): the tree index built by fit() (None otherwise)
+        lsh(MyLSHIndex): the hash tables built by fit() (None otherwise)
+        encoder(MyHammingEncoder or MyGowerEncoder): the encoded training data for
+            the hamming and gower metrics (None for euclidean)
 
     Notes:
         Terminology: instance = sample = row and attribute = feature = column
         Assumes data has been properly normalized before use.
+        Every exact algorithm returns exactly the same neighbors and distances; they
+            only differ in speed. "lsh" is approximate: it may miss some true
+            neighbors (see measure_recall()).
+        The tree and LSH indexes only support the euclidean metric; the hamming and
+            gower metrics are computed in bulk by brute force.
     """
-    def __init__(self, n_neighbors=3):
+    def __init__(self, n_neighbors=3, algorithm="auto", leaf_size=30, n_tables=10,
+            n_projections=4, bucket_width=None, random_state=None, metric="euclidean",
+            categorical_features=None, weights="uniform"):
         """Initializer for MyKNeighborsClassifier.
 
         Args:
             n_neighbors(int): number of k neighbors
+            algorithm(str): "brute" scans every training instance, "kd_tree" and
+                "ball_tree" build a tree index in fit(), and "auto" picks a k-d tree
+                for low-dimensional data (at most AUTO_TREE_MAX_FEATURES features)
+                and brute force otherwise
+            leaf_size(int): largest number of training instances in a tree leaf
+            n_tables(int): number of LSH hash tables; more tables raise recall
+            n_projections(int): projections per LSH hash table; more projections make
+                buckets smaller, so queries are faster but recall drops
+            bucket_width(float): LSH bucket width; wider buckets raise recall (None
+                to estimate it from the training data in fit())
+            random_state(int): seed for the LSH projections
+            metric(str): "euclidean" (the default), "hamming" for the fraction of
+                differing features (bit-packed, for coded categories and 0/1 flags)
+                or "gower" for mixed categorical and numeric features
+            categorical_features(list of int): indexes of the categorical features
+                for metric="gower" (None to treat the ones holding strings as
+                categorical)
+            weights(str): "uniform" gives every neighbor one vote; "distance" weights
+                each vote by the inverse of its distance (neighbors at distance 0, if
+                any, share all the weight)
         """
+        if algorithm not in KNEIGHBORS_ALGORITHMS:
+            raise ValueError("algorithm must be one of " + str(KNEIGHBORS_ALGORITHMS))
+        if metric not in KNEIGHBORS_METRICS:
+            raise ValueError("metric must be one of " + str(KNEIGHBORS_METRICS))
+        if metric != "euclidean" and algorithm not in ("auto", "brute"):
+            raise ValueError("algorithm=" + repr(algorithm) + " only supports metric='euclidean'")
+        if weights not in KNEIGHBORS_WEIGHTS:
+            raise ValueError("weights must be one of " + str(KNEIGHBORS_WEIGHTS))
         self.n_neighbors = n_neighbors
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.n_tables = n_tables
+        self.n_projections = n_projections
+        self.bucket_width = bucket_width
+        self.random_state = random_state
+        self.metric = metric
+        self.categorical_features = categorical_features
+        self.weights = weights
         self.X_train = None
         self.y_train = None
+        self.classes = None
+        self.tree = None
+        self.lsh = None
+        self.encoder = None
+        self._X_train_array = None
 
     def fit(self, X_train, y_train):
         """Fits a kNN classifier to X_train and y_train.
@@ -35,89 +178,605 @@ class MyKNeighborsClassifier:
 
         Notes:
             Since kNN is a lazy learning algorithm, this method just stores X_train and y_train
+                (and builds the tree index or hash tables the algorithm uses)
         """
         self.X_train = X_train
         self.y_train = y_train
+        self._encode_labels()
+        self._X_train_array = None
+        self.tree = None
+        self.lsh = None
+        self.encoder = None
+        if self.metric == "hamming":
+            self.encoder = MyHammingEncoder(X_train)
+        elif self.metric == "gower":
+            self.encoder = MyGowerEncoder(X_train, self.categorical_features)
+        algorithm = self._effective_algorithm()
+        if algorithm == "kd_tree":
+            self.tree = MyKDTree(self._train_array(), self.leaf_size)
+        elif algorithm == "ball_tree":
+            self.tree = MyBallTree(self._train_array(), self.leaf_size)
+        elif algorithm == "lsh":
+            self.lsh = MyLSHIndex(self._train_array(), self.n_tables, self.n_projections,
+                self.bucket_width, self.random_state)
+
+    def _effective_algorithm(self):
+        """Resolves algorithm="auto" for the current training set.
+        """
+        if self.algorithm != "auto":
+            return self.algorithm
+        if self.metric != "euclidean" or len(self.X_train) <= self.leaf_size:
+            return "brute"
+        if self._train_array().shape[1] > AUTO_TREE_MAX_FEATURES:
+            return "brute"
+        return "kd_tree"
+
+    def _encode_labels(self, new_labels=None):
+        """Codes y_train as positions in the sorted distinct labels (self.classes).
+
+        Args:
+            new_labels(list of obj): labels just appended to y_train (None to recode
+                all of y_train)
+        """
+        if new_labels is not None and all(label in self._class_codes for label in new_labels):
+            new_codes = np.array([self._class_codes[label] for label in new_labels], dtype=np.intp)
+            self._y_codes = np.concatenate([self._y_codes, new_codes])
+            return
+        classes = list(dict.fromkeys(self.y_train))
+        try:
+            classes.sort()
+        except TypeError:
+            # labels that cannot be compared keep their order of first appearance
+            pass
+        self.classes = classes
+        self._class_codes = {label: i for i, label in enumerate(classes)}
+        self._y_codes = np.array([self._class_codes[label] for label in self.y_train], dtype=np.intp)
+
+    def partial_fit(self, X, y):
+        """Adds labeled training instances without refitting from scratch.
+
+        Args:
+            X(list of list of obj): new training instances, shape (n_new, n_features)
+            y(list of obj): their target y values (parallel to X)
+
+        Notes:
+            The new instances are appended to the training arrays. LSH hashes them
+                into its tables, and the hamming/gower encoders encode just them.
+            A tree keeps them in an unindexed tail that kneighbors() scans by brute
+                force, and is rebuilt once the tail exceeds TREE_REBUILD_FRACTION of
+                the indexed instances (amortized O(log n) work per instance).
+            Calling it on an unfitted classifier is the same as fit().
+        """
+        if self.y_train is None:
+            self.fit(X, y)
+            return
+        if len(X) == 0:
+            return
+        self.y_train = list(self.y_train) + list(y)
+        self._encode_labels(y)
+        if self.encoder is not None:
+            self.encoder.extend(X)
+            if self.X_train is not None:
+                self.X_train = list(self.X_train) + list(X)
+            return
+
+        X_new = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+        X_train = np.concatenate([self._train_array(), X_new])
+        if isinstance(self.X_train, np.ndarray):
+            self.X_train = X_train
+        else:
+            self.X_train = list(self.X_train) + list(X)
+        self._X_train_array = X_train
+
+        if self.lsh is not None:
+            self.lsh.insert(X_new)
+        elif self.tree is not None:
+            self.tree.X = X_train
+            n_indexed = len(self.tree.indices)
+            if len(X_train) - n_indexed > max(self.leaf_size, TREE_REBUILD_FRACTION * n_indexed):
+                self.tree = type(self.tree)(X_train, self.leaf_size)
+        else:
+            # "auto" may call for a tree now that the training set has grown
+            algorithm = self._effective_algorithm()
+            if algorithm == "kd_tree":
+                self.tree = MyKDTree(X_train, self.leaf_size)
+            elif algorithm == "ball_tree":
+                self.tree = MyBallTree(X_train, self.leaf_size)
+
+    def save(self, path):
+        """Saves the fitted classifier to a directory.
+
+        Args:
+            path(str): directory to write (created if needed, existing files are replaced)
 
-    def kneighbors(self, X_test):
+        Notes:
+            The directory holds a header.json with the parameters, the class labels
+                and the index metadata, plus one .npy file per array: the float64
+                training matrix (or the encoded training data for the hamming and gower
+                metrics), the integer-coded labels and any tree, LSH or encoder arrays.
+                Every array can be memory-mapped by load().
+            Labels and categorical values must be json-serializable (numbers or strings).
+        """
+        os.makedirs(path, exist_ok=True)
+        classes = {}
+        for label in self.y_train:
+            if label not in classes:
+                classes[label] = len(classes)
+        arrays = {"y": np.array([classes[label] for label in self.y_train], dtype=np.int64)}
+        header = {"version": KNN_FORMAT_VERSION,
+            "params": {"n_neighbors": self.n_neighbors, "algorithm": self.algorithm,
+                "leaf_size": self.leaf_size, "n_tables": self.n_tables,
+                "n_projections": self.n_projections, "bucket_width": self.bucket_width,
+                "random_state": _json_value(self.random_state), "metric": self.metric,
+                "categorical_features": self.categorical_features, "weights": self.weights},
+            "classes": [_json_value(label) for label in classes],
+            "index": None, "index_meta": None, "encoder_meta": None, "arrays": []}
+        if self.encoder is not None:
+            meta, encoder_arrays = self.encoder.get_state()
+            header["encoder_meta"] = meta
+            arrays.update(("encoder." + name, array) for name, array in encoder_arrays.items())
+        else:
+            arrays["X"] = self._train_array()
+        if self.tree is not None:
+            header["index"] = "kd_tree" if isinstance(self.tree, MyKDTree) else "ball_tree"
+            header["index_meta"], index_arrays = self.tree.get_state()
+        elif self.lsh is not None:
+            header["index"] = "lsh"
+            header["index_meta"], index_arrays = self.lsh.get_state()
+        else:
+            index_arrays = {}
+        arrays.update(("index." + name, array) for name, array in index_arrays.items())
+
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array, allow_pickle=False)
+            header["arrays"].append(name)
+        with open(os.path.join(path, "header.json"), 'w') as file:
+            json.dump(header, file)
+
+    def load(self, path, mmap=True):
+        """Loads a classifier saved with save().
+
+        Args:
+            path(str): directory written by save()
+            mmap(bool): True to memory-map the arrays (read lazily by the OS), False
+                to read them into memory
+
+        Returns:
+            MyKNeighborsClassifier: return self so the caller can write code like
+                knn = MyKNeighborsClassifier().load(path)
+
+        Notes:
+            X_train is restored as a read-only float64 array for the euclidean metric,
+                and left as None for hamming and gower (their encoded training data is
+                restored instead).
+        """
+        with open(os.path.join(path, "header.json"), 'r') as file:
+            header = json.load(file)
+        if header.get("version") != KNN_FORMAT_VERSION:
+            raise ValueError("unsupported kNN model version: " + str(header.get("version")))
+        mmap_mode = 'r' if mmap else None
+        arrays = {}
+        for name in header["arrays"]:
+            arrays[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode, allow_pickle=False)
+
+        self.__init__(**header["params"])
+        classes = header["classes"]
+        self.y_train = [classes[code] for code in arrays["y"].tolist()]
+        self._encode_labels()
+        encoder_arrays = {name[len("encoder."):]: array for name, array in arrays.items() if name.startswith("encoder.")}
+        index_arrays = {name[len("index."):]: array for name, array in arrays.items() if name.startswith("index.")}
+        if self.metric == "hamming":
+            self.encoder = MyHammingEncoder.from_state(header["encoder_meta"], encoder_arrays)
+        elif self.metric == "gower":
+            self.encoder = MyGowerEncoder.from_state(header["encoder_meta"], encoder_arrays)
+        else:
+            self.X_train = arrays["X"]
+            self._X_train_array = arrays["X"]
+        if header["index"] == "kd_tree":
+            self.tree = MyKDTree.from_state(header["index_meta"], index_arrays, self._X_train_array)
+        elif header["index"] == "ball_tree":
+            self.tree = MyBallTree.from_state(header["index_meta"], index_arrays, self._X_train_array)
+        elif header["index"] == "lsh":
+            self.lsh = MyLSHIndex.from_state(header["index_meta"], index_arrays)
+        return self
+
+    def _train_array(self):
+        """Returns X_train as a float64 array (built once per fit).
+        """
+        if self._X_train_array is None:
+            self._X_train_array = np.asarray(self.X_train, dtype=np.float64).reshape(len(self.X_train), -1)
+        return self._X_train_array
+
+    def kneighbors(self, X_test, n_jobs=1):
         """Determines the k closes neighbors of each test instance.
 
         Args:
             X_test(list of list of numeric vals): The list of testing samples
                 The shape of X_test is (n_test_samples, n_features)
+            n_jobs(int): number of worker processes (1 runs in this process, -1 uses
+                every CPU)
 
         Returns:
             distances(list of list of float): 2D list of k nearest neighbor distances
                 for each instance in X_test
             neighbor_indices(list of list of int): 2D list of k nearest neighbor
                 indices in X_train (parallel to distances)
-        """
-        raw_distances = []
 
-        for test in X_test:
-            row_dist = []
-            for train in self.X_train:
-                d = myutils.euclidean_distance(train, test)
-                row_dist.append(d)
-            raw_distances.append(row_dist)
+        Notes:
+            Brute force computes distances with numpy in blocks of test rows that fit
+                in KNEIGHBORS_BLOCK_BYTES; a tree index only computes them for the
+                leaves it cannot prune, and LSH only for the training instances sharing
+                a bucket with the test instance (or for all of them when fewer than k
+                do). The k nearest are picked with a partial selection. Ties are
+                broken by the lower training index, and euclidean distances match
+                myutils.euclidean_distance() exactly.
+            With n_jobs, X_test is split into contiguous chunks handled by a process
+                pool. The training data (the tree's reordered copy, or the encoded
+                training data for the hamming and gower metrics) is published
+                once through shared memory rather than pickled to every worker, and
+                the chunks are reassembled in order, so the result is identical to
+                n_jobs=1.
+        """
+        if len(X_test) == 0:
+            return [], []
+        n_jobs = myutils.resolve_n_jobs(n_jobs, len(X_test))
+        if n_jobs > 1:
+            return self._kneighbors_parallel(X_test, n_jobs)
+        if self.encoder is not None:
+            return self._kneighbors_encoded(X_test)
+        X_train = self._train_array()
+        X_test_array = np.asarray(X_test, dtype=np.float64).reshape(len(X_test), -1)
+        # whole-number data makes the vectorized sums exact; otherwise near-ties are
+        # re-ranked with the scalar distance so the order matches it bit for bit
+        exact = myutils.is_integral(X_train) and myutils.is_integral(X_test_array)
+        k = min(self.n_neighbors, len(X_train))
 
-        # finding the nearest distances
         sorted_distances = []
         sorted_neighbors = []
-        
-        for item in raw_distances:
-            row_sort_dist = []
-            row_sort_neighbors = []
-            for i in range(self.n_neighbors):
-                index = item.index(min(item))
-                dist = item.pop(index)
-                item.insert(index, max(item)+1)
+        if self.tree is not None or self.lsh is not None:
+            tolerance = 0.0 if exact else NEAR_TIE_TOLERANCE
+            for i, x in enumerate(X_test_array):
+                if self.tree is not None:
+                    candidates, sums = self.tree.query_candidates(x, k, tolerance)
+                    n_indexed = len(self.tree.indices)
+                    if n_indexed < len(X_train):
+                        # instances added by partial_fit() since the last rebuild
+                        candidates = np.concatenate([candidates, np.arange(n_indexed, len(X_train))])
+                        sums = np.concatenate([sums, leaf_squared_distances(X_train[n_indexed:], x)])
+                else:
+                    candidates = self.lsh.query_candidates(x)
+                    if len(candidates) < k:
+                        candidates = np.arange(len(X_train))
+                    sums = leaf_squared_distances(X_train[candidates], x)
+                neighbors, distances = self._select(candidates, sums, k, X_test[i], exact)
+                sorted_neighbors.append(neighbors.tolist())
+                sorted_distances.append(distances)
+            return sorted_distances, sorted_neighbors
 
-                row_sort_neighbors.append(index)
-                row_sort_dist.append(dist)
+        every_index = np.arange(len(X_train))
+        block_rows = max(1, KNEIGHBORS_BLOCK_BYTES // (8 * max(1, len(X_train))))
+        for start in range(0, len(X_test_array), block_rows):
+            sums = myutils.squared_distances(X_train, X_test_array[start:start + block_rows])
+            for i, row in enumerate(sums):
+                neighbors, distances = self._select(every_index, row, k, X_test[start + i], exact)
+                sorted_neighbors.append(neighbors.tolist())
+                sorted_distances.append(distances)
 
-            sorted_distances.append(row_sort_dist)
-            sorted_neighbors.append(row_sort_neighbors)
+        return sorted_distances, sorted_neighbors
 
+    def _kneighbors_encoded(self, X_test):
+        """Runs kneighbors() for the hamming and gower metrics (see kneighbors()).
+        """
+        n_train = len(self.encoder.train[0])
+        k = min(self.n_neighbors, n_train)
+        every_index = np.arange(n_train)
+        block_rows = max(1, KNEIGHBORS_BLOCK_BYTES // (8 * max(1, n_train)))
+        sorted_distances = []
+        sorted_neighbors = []
+        for start in range(0, len(X_test), block_rows):
+            block = self.encoder.distances(self.encoder.encode(X_test[start:start + block_rows]))
+            for row in block:
+                neighbors = self._smallest(every_index, row, k)
+                sorted_neighbors.append(neighbors.tolist())
+                sorted_distances.append(row[neighbors].tolist())
         return sorted_distances, sorted_neighbors
 
-    def predict(self, X_test):
+    def _clone(self, n_neighbors):
+        """Returns an unfitted classifier with the same parameters and n_neighbors.
+        """
+        return MyKNeighborsClassifier(n_neighbors, self.algorithm, self.leaf_size, self.n_tables,
+            self.n_projections, self.bucket_width, self.random_state, self.metric,
+            self.categorical_features, self.weights)
+
+    def cross_validate_k(self, X, y, k_max, n_splits=10, random_state=None, n_jobs=1):
+        """Scores every n_neighbors from 1 to k_max with k-fold cross validation.
+
+        Args:
+            X(list of list of obj): the instances, shape (n_samples, n_features)
+            y(list of obj): their target y values (parallel to X)
+            k_max(int): largest n_neighbors to score
+            n_splits(int): number of folds
+            random_state(int): seed for shuffling the instances before splitting
+                (None to split them in order)
+            n_jobs(int): number of worker processes for the neighbor search (see
+                kneighbors())
+
+        Returns:
+            MyPyTable: one row per k. The column names and their order is as follows:
+                ["k", "correct", "total", "accuracy"], where accuracy is pooled over
+                every fold's predictions
+
+        Notes:
+            Each fold computes its neighbor ranking once, up to k_max (with this
+                classifier's algorithm and metric), and scores every k from its first k
+                neighbors, so a sweep costs one distance pass per fold instead of one
+                per k. The votes follow predict() (including weights="distance"), ties
+                going to the smallest label.
+            Folds are built like sklearn's KFold: the first n_samples % n_splits folds
+                get one extra instance.
+        """
+        indexes = list(range(len(X)))
+        if random_state is not None:
+            myutils.randomize_in_place(indexes, random_state)
+        folds = []
+        start = 0
+        for i in range(n_splits):
+            size = len(X) // n_splits + (1 if i < len(X) % n_splits else 0)
+            folds.append(indexes[start:start + size])
+            start += size
+        train_folds, test_folds = myutils.X_train_test_CV(n_splits, folds)
+
+        correct = [0] * k_max
+        total = 0
+        for train, test in zip(train_folds, test_folds):
+            if len(test) == 0 or len(train) == 0:
+                continue
+            classifier = self._clone(k_max)
+            classifier.fit([X[i] for i in train], [y[i] for i in train])
+            distances, neighbors = classifier.kneighbors([X[i] for i in test], n_jobs)
+            # scores[i, k, c]: votes for class c among the first k + 1 neighbors
+            votes = classifier._neighbor_votes(distances, neighbors)
+            scores = np.cumsum(votes, axis=1)
+            predicted = np.argmax(scores, axis=2)
+            truth = np.array([classifier._class_codes.get(y[i], -1) for i in test])
+            hits = (predicted == truth[:, None]).sum(axis=0).tolist()
+            for k in range(k_max):
+                # a fold with fewer than k_max training instances votes with all of them
+                correct[k] += hits[min(k, len(hits) - 1)]
+            total += len(test)
+
+        table = MyPyTable(column_names=["k", "correct", "total", "accuracy"])
+        table.data = [[k + 1, correct[k], total, correct[k] / total if total else None] for k in range(k_max)]
+        return table
+
+    def measure_recall(self, X_test, n_jobs=1):
+        """Measures how many of the true k nearest neighbors kneighbors() finds.
+
+        Args:
+            X_test(list of list of numeric vals): held-out instances to query
+            n_jobs(int): number of worker processes (see kneighbors())
+
+        Returns:
+            float: fraction of the exact (brute-force) neighbors, over every instance
+                in X_test, that are also returned by kneighbors()
+
+        Notes:
+            Meant for tuning algorithm="lsh" (n_tables, n_projections, bucket_width);
+                the exact algorithms always score 1.0.
+        """
+        if len(X_test) == 0:
+            return 1.0
+        exact = self._clone(self.n_neighbors)
+        exact.algorithm = "brute"
+        exact.fit(self.X_train, self.y_train)
+        _, true_neighbors = exact.kneighbors(X_test, n_jobs)
+        _, found_neighbors = self.kneighbors(X_test, n_jobs)
+        found = 0
+        total = 0
+        for true, approximate in zip(true_neighbors, found_neighbors):
+            found += len(set(true) & set(approximate))
+            total += len(true)
+        return found / total
+
+    def _kneighbors_parallel(self, X_test, n_jobs):
+        """Runs kneighbors() over a process pool (see kneighbors()).
+        """
+        # the workers reattach the arrays, so only the small parts are pickled
+        classifier = copy.copy(self)
+        classifier.X_train = None
+        classifier.y_train = None
+        classifier._X_train_array = None
+        blocks = []
+        specs = {}
+        try:
+            if self.encoder is not None:
+                classifier.encoder = copy.copy(self.encoder)
+                classifier.encoder.train = None
+                specs["encoded"] = []
+                for array in self.encoder.train:
+                    block, spec = _share_array(array)
+                    blocks.append(block)
+                    specs["encoded"].append(spec)
+            else:
+                block, specs["X"] = _share_array(self._train_array())
+                blocks.append(block)
+            if self.tree is not None:
+                block, specs["sorted_X"] = _share_array(self.tree._sorted_X)
+                blocks.append(block)
+                classifier.tree = copy.copy(self.tree)
+                classifier.tree.X = None
+                classifier.tree._sorted_X = None
+            if self.lsh is not None:
+                specs["lsh"] = []
+                for array in (self.lsh.orders, self.lsh.sorted_keys):
+                    block, spec = _share_array(array)
+                    blocks.append(block)
+                    specs["lsh"].append(spec)
+                classifier.lsh = copy.copy(self.lsh)
+                classifier.lsh.orders = None
+                classifier.lsh.sorted_keys = None
+
+            n_chunks = min(len(X_test), n_jobs * CHUNKS_PER_JOB)
+            bounds = np.linspace(0, len(X_test), n_chunks + 1).astype(int).tolist()
+            chunks = [[list(row) for row in X_test[bounds[i]:bounds[i + 1]]] for i in range(n_chunks)]
+            with multiprocessing.Pool(n_jobs, initializer=_init_kneighbors_worker,
+                    initargs=(classifier, specs)) as pool:
+                results = pool.map(_kneighbors_worker, chunks)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        distances = []
+        neighbors = []
+        for chunk_distances, chunk_neighbors in results:
+            distances.extend(chunk_distances)
+            neighbors.extend(chunk_neighbors)
+        return distances, neighbors
+
+    def _train_row(self, index):
+        """Returns one training instance as a list (numpy rows are converted to floats).
+        """
+        row = self.X_train[index]
+        if isinstance(row, np.ndarray):
+            return row.tolist()
+        return row
+
+    @staticmethod
+    def _smallest(candidates, values, k):
+        """Finds the k smallest values, ties broken by the lower candidate index.
+
+        Args:
+            candidates(numpy.ndarray of int): training indexes (parallel to values)
+            values(numpy.ndarray): distances (or squared distances) of the candidates
+            k(int): number of neighbors to select
+
+        Returns:
+            numpy.ndarray of int: positions (into candidates) of the k nearest, nearest first
+        """
+        kth = np.partition(values, k - 1)[k - 1]
+        keep = np.flatnonzero(values <= kth)
+        order = np.lexsort((candidates[keep], values[keep]))[:k]
+        return keep[order]
+
+    def _select(self, candidates, sums, k, test, exact):
+        """Selects the k nearest of some candidate training instances.
+
+        Args:
+            candidates(numpy.ndarray of int): training indexes to choose from
+            sums(numpy.ndarray): their vectorized squared distances to the test instance
+            k(int): number of neighbors to select
+            test(list of numeric vals): the test instance
+            exact(bool): True if the squared distances are exact (whole-number data)
+
+        Returns:
+            numpy.ndarray of int: indexes of the k nearest training instances
+            list of float: their distances
+
+        Notes:
+            Ties are broken by the lower training index. When the sums are not exact,
+                every candidate within NEAR_TIE_TOLERANCE of the k-th one is re-ranked
+                with myutils.euclidean_distance(), since the vectorized and scalar sums
+                can differ by a few ulps.
+        """
+        if exact:
+            keep = self._smallest(candidates, sums, k)
+            return candidates[keep], [value ** (1/2) for value in sums[keep].tolist()]
+
+        kth = np.partition(sums, k - 1)[k - 1]
+        keep = np.flatnonzero(sums <= kth + abs(kth) * NEAR_TIE_TOLERANCE)
+        near = candidates[keep]
+        distances = [myutils.euclidean_distance(self._train_row(j), test) for j in near.tolist()]
+        order = np.lexsort((near, distances))[:k]
+        return near[order], [distances[j] for j in order.tolist()]
+
+    def _neighbor_votes(self, distances, neighbors):
+        """Spreads each test instance's neighbor votes over the classes.
+
+        Args:
+            distances(list of list of float): kneighbors() distances
+            neighbors(list of list of int): kneighbors() indexes
+
+        Returns:
+            numpy.ndarray: votes[i, j, c] is the weight neighbor j of test instance i
+                gives to class c, shape (n_test, k, n_classes)
+        """
+        neighbors = np.array(neighbors, dtype=np.intp).reshape(len(neighbors), -1)
+        n_test, k = neighbors.shape
+        weights = self._neighbor_weights(np.array(distances, dtype=np.float64).reshape(n_test, k))
+        votes = np.zeros((n_test, k, len(self.classes)))
+        rows, columns = np.indices((n_test, k))
+        votes[rows, columns, self._y_codes[neighbors]] = weights
+        return votes
+
+    def _neighbor_weights(self, distances):
+        """Returns the vote weight of each neighbor (same shape as distances).
+
+        Notes:
+            With weights="distance", a test instance that has neighbors at distance 0
+                gives them weight 1 and the others 0 (the inverse would be infinite).
+        """
+        if self.weights == "uniform":
+            return np.ones_like(distances)
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        zero = distances == 0
+        exact_match = zero.any(axis=1)
+        weights[exact_match] = zero[exact_match]
+        return weights
+
+    def _class_scores(self, X_test, n_jobs):
+        """Sums the neighbor votes for each class of every test instance.
+
+        Returns:
+            numpy.ndarray: scores, shape (n_test, n_classes), columns in self.classes order
+
+        Notes:
+            All test instances are tallied together with a single numpy.bincount() over
+                (test instance, class) cells.
+        """
+        distances, neighbors = self.kneighbors(X_test, n_jobs)
+        n_classes = len(self.classes)
+        if len(neighbors) == 0:
+            return np.zeros((0, n_classes))
+        neighbors = np.array(neighbors, dtype=np.intp).reshape(len(neighbors), -1)
+        weights = self._neighbor_weights(np.array(distances, dtype=np.float64).reshape(neighbors.shape))
+        cells = self._y_codes[neighbors] + (np.arange(len(neighbors)) * n_classes)[:, None]
+        scores = np.bincount(cells.ravel(), weights=weights.ravel(), minlength=len(neighbors) * n_classes)
+        return scores.reshape(len(neighbors), n_classes)
+
+    def predict(self, X_test, n_jobs=1):
         """Makes predictions for test instances in X_test.
 
         Args:
             X_test(list of list of numeric vals): The list of testing samples
                 The shape of X_test is (n_test_samples, n_features)
+            n_jobs(int): number of worker processes for the neighbor search (see
+                kneighbors())
 
         Returns:
             y_predicted(list of obj): The predicted target y values (parallel to X_test)
+
+        Notes:
+            Predicts the label with the most votes (see weights); a tie goes to the
+                smallest label.
         """
-        y_predicted = []
-        distances, neighbors = self.kneighbors(X_test)
-
-        for item in neighbors:
-            item_pred = []
-            for index in item:
-                item_pred.append(self.y_train[index])
-            values, count = myutils.get_frequencies(item_pred)
-
-            # find max of count for tie purposes
-            _max_ = max(count)
-            _max_index_ = count.index(_max_)
-
-            max_list = []
-            for i in range(len(count)):
-                if count[i] == _max_:
-                    max_list.append(values[i])
-            
-            # if tie, use whichever value appears first in prediction, ordered by proximity
-            if len(max_list) > 1:
-                for item in item_pred:
-                    if item in max_list:
-                        y_predicted.append(item)
-                        break
-
-            # if no tie, simply append whatever value has max count
-            else:
-                y_predicted.append(values[_max_index_])
+        scores = self._class_scores(X_test, n_jobs)
+        # classes are sorted, so argmax's first maximum is the smallest tied label
+        return [self.classes[i] for i in np.argmax(scores, axis=1).tolist()]
 
-        return y_predicted
\ No newline at end of file
+    def predict_proba(self, X_test, n_jobs=1):
+        """Estimates class probabilities for test instances in X_test.
+
+        Args:
+            X_test(list of list of numeric vals): The list of testing samples
+                The shape of X_test is (n_test_samples, n_features)
+            n_jobs(int): number of worker processes for the neighbor search (see
+                kneighbors())
+
+        Returns:
+            list of list of float: for each test instance, the share of the neighbor
+                votes (see weights) for each label, in the order of self.classes
+        """
+        scores = self._class_scores(X_test, n_jobs)
+        return (scores / scores.sum(axis=1, keepdims=True)).tolist()
@@ -0,0 +1,812 @@
+import numpy as np
+
+def leaf_squared_distances(points, x):
+    """Computes the squared euclidean distance from x to each of a block of points.
+
+    Args:
+        points(numpy.ndarray): float instances, shape (n_points, n_features)
+        x(numpy.ndarray): one float instance, shape (n_features,)
+
+    Returns:
+        numpy.ndarray: squared distances, shape (n_points,)
+
+    Notes:
+        Adds the squared differences feature by feature, exactly like
+            myutils.squared_distances(), so both give bit-identical sums.
+    """
+    sums = np.zeros(len(points))
+    for j in range(points.shape[1]):
+        diff = x[j] - points[:, j]
+        diff *= diff
+        sums += diff
+    return sums
+
+class MyBinaryTree:
+    """Represents a binary space-partitioning tree for exact nearest-neighbor queries.
+
+    Attributes:
+        X(numpy.ndarray): the indexed instances, shape (n_samples, n_features)
+        leaf_size(int): largest number of instances kept in a leaf
+        indices(numpy.ndarray of int): instance indexes ordered so each node owns a
+            contiguous range of them
+        starts(list of int): first position (into indices) owned by each node
+        ends(list of int): one past the last position owned by each node
+        lefts(list of int): left child of each node (-1 for a leaf)
+        rights(list of int): right child of each node (-1 for a leaf)
+        min_indexes(list of int): smallest instance index owned by each node
+
+    Notes:
+        Subclasses describe each node's region (a box or a ball) and give a lower
+            bound on the squared distance from a query to anything inside it.
+        Node 0 is the root. Nodes are split on the feature with the largest spread,
+            at the median.
+    """
+    def __init__(self, X, leaf_size=30):
+        """Initializer for MyBinaryTree.
+
+        Args:
+            X(numpy.ndarray): float instances to index, shape (n_samples, n_features)
+            leaf_size(int): largest number of instances kept in a leaf
+        """
+        self.X = X
+        self.leaf_size = max(1, int(leaf_size))
+        self.indices = np.arange(len(X))
+        self.starts = []
+        self.ends = []
+        self.lefts = []
+        self.rights = []
+        self.min_indexes = []
+        self._sorted_X = None
+        self._build()
+
+    def _build(self):
+        """Builds the nodes with an explicit stack (no recursion limit on deep trees).
+        """
+        self._add_node(0, len(self.X))
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            start, end = self.starts[node], self.ends[node]
+            if end - start <= self.leaf_size:
+                continue
+            points = self.X[self.indices[start:end]]
+            spread = points.max(axis=0) - points.min(axis=0)
+            dim = int(np.argmax(spread))
+            if spread[dim] == 0:
+                # every instance in the node is identical; it cannot be split
+                continue
+            middle = (end - start) // 2
+            # equal values are ordered by index, so duplicates split off with their
+            # lowest indexes on the left (the side tie-breaking prefers)
+            order = np.lexsort((self.indices[start:end], points[:, dim]))
+            self.indices[start:end] = self.indices[start:end][order]
+            self.lefts[node] = self._add_node(start, start + middle)
+            self.rights[node] = self._add_node(start + middle, end)
+            stack.append(self.lefts[node])
+            stack.append(self.rights[node])
+        self._sorted_X = self.X[self.indices]
+
+    def _add_node(self, start, end):
+        """Appends a node owning positions start..end-1 and returns its id.
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lefts.append(-1)
+        self.rights.append(-1)
+        self.min_indexes.append(int(self.indices[start:end].min()) if end > start else len(self.X))
+        self._describe_node(self.X[self.indices[start:end]])
+        return len(self.starts) - 1
+
+    def _describe_node(self, points):
+        """Stores the region of a new node (implemented by subclasses).
+        """
+        raise NotImplementedError
+
+    def lower_bound(self, node, x):
+        """Returns a lower bound on the squared distance from x to the node (subclasses).
+        """
+        raise NotImplementedError
+
+    def get_state(self):
+        """Returns the tree as json-ready metadata plus numpy arrays (see from_state()).
+        """
+        meta = {"leaf_size": self.leaf_size}
+        arrays = {"indices": self.indices, "sorted_X": self._sorted_X}
+        for name in ("starts", "ends", "lefts", "rights", "min_indexes") + self.REGION_ATTRIBUTES:
+            arrays[name] = np.array(getattr(self, name))
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays, X):
+        """Rebuilds a tree from get_state() output.
+
+        Args:
+            meta(dict): metadata from get_state()
+            arrays(dict of str: numpy.ndarray): arrays from get_state() (may be memory-mapped)
+            X(numpy.ndarray): the indexed instances
+        """
+        tree = cls.__new__(cls)
+        tree.X = X
+        tree.leaf_size = meta["leaf_size"]
+        tree.indices = arrays["indices"]
+        tree._sorted_X = arrays["sorted_X"]
+        # the node lists are walked in Python, so they are read back as lists
+        for name in ("starts", "ends", "lefts", "rights", "min_indexes") + cls.REGION_ATTRIBUTES:
+            setattr(tree, name, arrays[name].tolist())
+        return tree
+
+    def query_candidates(self, x, k, tolerance=0.0):
+        """Finds every indexed instance that can be among the k nearest neighbors of x.
+
+        Args:
+            x(numpy.ndarray): the query instance
+            k(int): number of neighbors wanted
+            tolerance(float): relative slack kept above the k-th smallest squared
+                distance (0 when the squared distances are exact, e.g. whole-number data)
+
+        Returns:
+            numpy.ndarray of int: indexes of the candidate instances
+            numpy.ndarray of float: their squared distances (computed like
+                leaf_squared_distances())
+
+        Notes:
+            With a tolerance, the candidates are every instance whose squared distance
+                is within tolerance of the k-th smallest one, so the caller can re-rank
+                near-ties exactly as brute force does. With tolerance 0 they are exactly
+                the k nearest, ties broken by the lower index.
+            Nodes are visited nearest first and skipped once their lower bound is
+                above that threshold (or, with tolerance 0, equal to it while every
+                index in the node is above the k-th candidate's).
+        """
+        # node bounds are computed in plain Python: a handful of features is far
+        # cheaper to loop over than to hand to numpy once per node
+        x = [float(value) for value in x]
+        candidate_indexes = np.empty(0, dtype=np.intp)
+        candidate_sums = np.empty(0)
+        threshold = np.inf
+        kth_index = len(self.X)
+        stack = [(0, self.lower_bound(0, x))]
+        while stack:
+            node, bound = stack.pop()
+            if bound > threshold or (bound == threshold and self.min_indexes[node] > kth_index):
+                continue
+            left = self.lefts[node]
+            if left < 0:
+                start, end = self.starts[node], self.ends[node]
+                sums = leaf_squared_distances(self._sorted_X[start:end], x)
+                keep = sums <= threshold
+                candidate_indexes = np.concatenate([candidate_indexes, self.indices[start:end][keep]])
+                candidate_sums = np.concatenate([candidate_sums, sums[keep]])
+                if len(candidate_sums) >= k and tolerance == 0:
+                    order = np.lexsort((candidate_indexes, candidate_sums))[:k]
+                    candidate_indexes = candidate_indexes[order]
+                    candidate_sums = candidate_sums[order]
+                    threshold = candidate_sums[-1]
+                    kth_index = candidate_indexes[-1]
+                elif len(candidate_sums) >= k:
+                    kth = np.partition(candidate_sums, k - 1)[k - 1]
+                    threshold = kth + abs(kth) * tolerance
+                    keep = candidate_sums <= threshold
+                    candidate_indexes = candidate_indexes[keep]
+                    candidate_sums = candidate_sums[keep]
+                continue
+
+            right = self.rights[node]
+            left_bound = self.lower_bound(left, x)
+            right_bound = self.lower_bound(right, x)
+            # push the farther child first so the nearer one is searched first (on a
+            # tie, the one holding lower indexes, which tightens kth_index sooner)
+            if (left_bound, self.min_indexes[left]) <= (right_bound, self.min_indexes[right]):
+                stack.append((right, right_bound))
+                stack.append((left, left_bound))
+            else:
+                stack.append((left, left_bound))
+                stack.append((right, right_bound))
+        return candidate_indexes, candidate_sums
+
+class MyKDTree(MyBinaryTree):
+    """Represents a k-d tree: every node is the bounding box of its instances.
+
+    Attributes:
+        mins(list of list of float): lower corner of each node's box
+        maxs(list of list of float): upper corner of each node's box
+
+    Notes:
+        Works best in low dimensions (a handful of features).
+    """
+    REGION_ATTRIBUTES = ("mins", "maxs")
+
+    def __init__(self, X, leaf_size=30):
+        """Initializer for MyKDTree.
+
+        Args:
+            X(numpy.ndarray): float instances to index, shape (n_samples, n_features)
+            leaf_size(int): largest number of instances kept in a leaf
+        """
+        self.mins = []
+        self.maxs = []
+        MyBinaryTree.__init__(self, X, leaf_size)
+
+    def _describe_node(self, points):
+        if len(points):
+            self.mins.append(points.min(axis=0).tolist())
+            self.maxs.append(points.max(axis=0).tolist())
+        else:
+            self.mins.append([np.inf] * self.X.shape[1])
+            self.maxs.append([-np.inf] * self.X.shape[1])
+
+    def lower_bound(self, node, x):
+        """Returns the squared distance from x to the node's box (0 inside the box).
+
+        Notes:
+            The gaps are squared and added in feature order like
+                leaf_squared_distances(), and rounding is monotone, so the bound never
+                exceeds the computed squared distance of any instance in the box.
+        """
+        bound = 0.0
+        for low, high, value in zip(self.mins[node], self.maxs[node], x):
+            if value < low:
+                bound += (low - value) * (low - value)
+            elif value > high:
+                bound += (value - high) * (value - high)
+        return bound
+
+class MyBallTree(MyBinaryTree):
+    """Represents a ball tree: every node is a ball (centroid and radius) around its instances.
+
+    Attributes:
+        centroids(list of list of float): centroid of each node's instances
+        radii(list of float): distance from the centroid to the farthest instance
+
+    Notes:
+        Balls stay tighter than boxes as the number of features grows.
+    """
+    REGION_ATTRIBUTES = ("centroids", "radii")
+
+    def __init__(self, X, leaf_size=30):
+        """Initializer for MyBallTree.
+
+        Args:
+            X(numpy.ndarray): float instances to index, shape (n_samples, n_features)
+            leaf_size(int): largest number of instances kept in a leaf
+        """
+        self.centroids = []
+        self.radii = []
+        MyBinaryTree.__init__(self, X, leaf_size)
+
+    def _describe_node(self, points):
+        if len(points):
+            centroid = points.mean(axis=0)
+            self.centroids.append(centroid.tolist())
+            self.radii.append(float(np.sqrt(leaf_squared_distances(points, centroid).max())))
+        else:
+            self.centroids.append([0.0] * self.X.shape[1])
+            self.radii.append(-np.inf)
+
+    def lower_bound(self, node, x):
+        """Returns a lower bound on the squared distance from x to the node's ball.
+
+        Notes:
+            The centroid is not an instance, so the bound is loosened by a relative
+                1e-9 to absorb rounding in the centroid distance and the radius.
+        """
+        if self.radii[node] == -np.inf:
+            return np.inf
+        distance = 0.0
+        for center, value in zip(self.centroids[node], x):
+            distance += (value - center) * (value - center)
+        distance = distance ** (1/2)
+        radius = self.radii[node]
+        gap = distance - radius - 1e-9 * (distance + radius)
+        if gap <= 0:
+            return 0.0
+        return gap * gap
+
+class MyLSHIndex:
+    """Represents random-projection (p-stable) locality-sensitive hash tables for
+        approximate nearest-neighbor queries.
+
+    Attributes:
+        n_tables(int): number of hash tables; more tables find more true neighbors
+        n_projections(int): projections concatenated into each table's key; more
+            projections make buckets smaller (faster, but lower recall)
+        bucket_width(float): width of each projection's buckets
+        projections(numpy.ndarray): gaussian projection vectors, shape
+            (n_tables * n_projections, n_features)
+        offsets(numpy.ndarray): random bucket offsets in [0, bucket_width), one per projection
+        multipliers(numpy.ndarray of int): odd multipliers folding a table's bucket
+            coordinates into one int64 key
+        orders(numpy.ndarray of int): each table's instance indexes sorted by key (ties
+            by index), shape (n_tables, n_indexed)
+        sorted_keys(numpy.ndarray of int): each table's keys in orders order, searched
+            with numpy.searchsorted() at query time, shape (n_tables, n_indexed)
+
+    Notes:
+        Each projection hashes x to floor((a . x + b) / bucket_width), so instances
+            that are close in euclidean distance tend to share a bucket. A query only
+            looks at the instances sharing a bucket with it in at least one table.
+        Two different buckets can fold into the same key; that only adds candidates.
+    """
+    def __init__(self, X, n_tables=10, n_projections=4, bucket_width=None, random_state=None):
+        """Initializer for MyLSHIndex.
+
+        Args:
+            X(numpy.ndarray): float instances to index, shape (n_samples, n_features)
+            n_tables(int): number of hash tables
+            n_projections(int): projections per table
+            bucket_width(float): bucket width (None to use 4 times the median
+                nearest-neighbor distance of a sample of X)
+            random_state(int): seed for the projections (None for a random seed)
+        """
+        self.n_tables = max(1, int(n_tables))
+        self.n_projections = max(1, int(n_projections))
+        rng = np.random.default_rng(random_state)
+        if bucket_width is None:
+            bucket_width = self.estimate_bucket_width(X, rng)
+        self.bucket_width = float(bucket_width)
+        self.projections = rng.standard_normal((self.n_tables * self.n_projections, X.shape[1]))
+        self.offsets = rng.uniform(0, self.bucket_width, self.n_tables * self.n_projections)
+        self.multipliers = rng.integers(1, 2**62, self.n_projections) | 1
+        self.orders = np.empty((self.n_tables, 0), dtype=np.intp)
+        self.sorted_keys = np.empty((self.n_tables, 0), dtype=np.int64)
+        self.insert(X)
+
+    @staticmethod
+    def estimate_bucket_width(X, rng, sample_size=64):
+        """Estimates a bucket width from the nearest-neighbor distances of a sample of X.
+
+        Returns:
+            float: 4 times the median nearest-neighbor distance (1.0 if it is 0)
+        """
+        if len(X) < 2:
+            return 1.0
+        sample = rng.choice(len(X), min(sample_size, len(X)), replace=False)
+        nearest = []
+        for i in sample.tolist():
+            sums = leaf_squared_distances(X, X[i])
+            sums[i] = np.inf
+            nearest.append(sums.min() ** (1/2))
+        width = 4 * float(np.median(nearest))
+        return width if width > 0 else 1.0
+
+    def hash(self, X):
+        """Computes the bucket key of instances in every table.
+
+        Args:
+            X(numpy.ndarray): float instances, shape (n_instances, n_features)
+
+        Returns:
+            numpy.ndarray of int: keys, shape (n_tables, n_instances)
+        """
+        # projected feature by feature so one row hashes the same alone or in a batch
+        projected = np.zeros((len(X), len(self.projections)))
+        for j in range(X.shape[1]):
+            projected += X[:, j, None] * self.projections[None, :, j]
+        codes = np.floor((projected + self.offsets) / self.bucket_width).astype(np.int64)
+        codes = codes.reshape(len(X), self.n_tables, self.n_projections)
+        # int64 arithmetic wraps around, which is fine for a hash
+        return (codes * self.multipliers).sum(axis=2).T
+
+    def insert(self, X):
+        """Adds instances to the hash tables, numbered after the ones already indexed.
+
+        Args:
+            X(numpy.ndarray): float instances, shape (n_new, n_features)
+        """
+        new_keys = self.hash(X)
+        n_old = self.orders.shape[1]
+        keys = np.empty((self.n_tables, n_old + len(X)), dtype=np.int64)
+        # the keys in instance order, recovered from the sorted ones
+        np.put_along_axis(keys[:, :n_old], self.orders, self.sorted_keys, axis=1)
+        keys[:, n_old:] = new_keys
+        self.orders = np.argsort(keys, axis=1, kind="stable")
+        self.sorted_keys = np.take_along_axis(keys, self.orders, axis=1)
+
+    def get_state(self):
+        """Returns the hash tables as json-ready metadata plus numpy arrays (see from_state()).
+        """
+        meta = {"n_tables": self.n_tables, "n_projections": self.n_projections,
+            "bucket_width": self.bucket_width}
+        arrays = {"projections": self.projections, "offsets": self.offsets,
+            "multipliers": self.multipliers, "orders": self.orders, "sorted_keys": self.sorted_keys}
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        """Rebuilds the hash tables from get_state() output.
+        """
+        index = cls.__new__(cls)
+        index.n_tables = meta["n_tables"]
+        index.n_projections = meta["n_projections"]
+        index.bucket_width = meta["bucket_width"]
+        for name in ("projections", "offsets", "multipliers", "orders", "sorted_keys"):
+            setattr(index, name, arrays[name])
+        return index
+
+    def query_candidates(self, x):
+        """Finds the indexed instances sharing a bucket with x in at least one table.
+
+        Args:
+            x(numpy.ndarray): the query instance
+
+        Returns:
+            numpy.ndarray of int: the candidate indexes, ascending and without repeats
+        """
+        found = []
+        for t, key in enumerate(self.hash(x.reshape(1, -1))[:, 0].tolist()):
+            start = np.searchsorted(self.sorted_keys[t], key, side="left")
+            end = np.searchsorted(self.sorted_keys[t], key, side="right")
+            if end > start:
+                found.append(self.orders[t][start:end])
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(found))
+
+def popcount(words):
+    """Counts the set bits of every element of an unsigned integer array.
+
+    Args:
+        words(numpy.ndarray of uint64): packed bits
+
+    Returns:
+        numpy.ndarray of int: number of set bits per element (same shape as words)
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    # numpy < 2.0: look the bytes up in a table
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape + (8,))
+    return table[as_bytes].sum(axis=-1)
+
+def pack_bits(bits):
+    """Packs boolean rows into uint64 words.
+
+    Args:
+        bits(numpy.ndarray of bool): shape (n_rows, n_bits)
+
+    Returns:
+        numpy.ndarray of uint64: shape (n_rows, ceil(n_bits / 64))
+    """
+    packed = np.packbits(bits, axis=1)
+    width = -(-packed.shape[1] // 8) * 8
+    padded = np.zeros((len(bits), width), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(np.uint64)
+
+def _category_codes(column, categories, add=False):
+    """Returns the position of each value of a column in categories (-1 if unseen).
+
+    Args:
+        column(list of obj): the values
+        categories(dict of obj: int): position of each known value
+        add(bool): True to append unseen values to categories instead
+    """
+    if add:
+        for value in column:
+            if value not in categories:
+                categories[value] = len(categories)
+    return np.array([categories.get(value, -1) for value in column], dtype=np.int64).reshape(-1)
+
+def _json_value(value):
+    """Converts numpy scalars to the Python values json can store.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class MyHammingEncoder:
+    """Bit-packs categorical instances so hamming distances are XORs and popcounts.
+
+    Attributes:
+        n_features(int): number of features
+        categories(list of dict of obj: int): for each feature, the position of each
+            value seen in training (in order of first appearance)
+        binary(list of bool): True for features with at most two training values,
+            which take one bit; the others are one-hot encoded
+        offsets(list of int): first bit of each feature in its packed block
+        train(tuple of numpy.ndarray): packed training instances (binary words,
+            one-hot words)
+
+    Notes:
+        The distance between two instances is the fraction of features whose values
+            differ. A flag feature costs one bit instead of a 64-bit float.
+        Two one-hot codes that differ set two bits in their XOR, so the one-hot
+            popcounts are halved. A test value never seen in training has its
+            feature's bits masked out and counts as a mismatch with every instance.
+    """
+    def __init__(self, X):
+        """Initializer for MyHammingEncoder.
+
+        Args:
+            X(list of list of obj): training instances, shape (n_samples, n_features)
+        """
+        self.n_features = len(X[0]) if len(X) else 0
+        self.categories = [{} for _ in range(self.n_features)]
+        codes = self.category_codes(X, add=True)
+        self._layout()
+        self.train = self.pack(codes)[:2]
+
+    def category_codes(self, X, add=False):
+        """Looks up the category position of every value of some instances.
+
+        Args:
+            X(list of list of obj): instances, shape (n_instances, n_features)
+            add(bool): True to add unseen values to the categories
+
+        Returns:
+            numpy.ndarray of int: positions (-1 for unseen values), shape (n_instances, n_features)
+        """
+        codes = np.empty((len(X), self.n_features), dtype=np.int64)
+        for j in range(self.n_features):
+            codes[:, j] = _category_codes([row[j] for row in X], self.categories[j], add)
+        return codes
+
+    def _layout(self):
+        """Assigns each feature its bits from the number of categories it has.
+        """
+        self.binary = []
+        self.offsets = []
+        n_binary = 0
+        n_onehot = 0
+        for categories in self.categories:
+            if len(categories) <= 2:
+                self.binary.append(True)
+                self.offsets.append(n_binary)
+                n_binary += 1
+            else:
+                self.binary.append(False)
+                self.offsets.append(n_onehot)
+                n_onehot += len(categories)
+        self._n_bits = (n_binary, n_onehot)
+
+    def pack(self, codes):
+        """Packs category positions into bit words.
+
+        Args:
+            codes(numpy.ndarray of int): positions from category_codes()
+
+        Returns:
+            tuple: binary words, one-hot words, their masks of bits to compare (None
+                if every value was seen in training) and the number of unseen values
+                per instance
+        """
+        n = len(codes)
+        binary_bits = np.zeros((n, self._n_bits[0]), dtype=bool)
+        onehot_bits = np.zeros((n, self._n_bits[1]), dtype=bool)
+        binary_care = np.ones((n, self._n_bits[0]), dtype=bool)
+        onehot_care = np.ones((n, self._n_bits[1]), dtype=bool)
+        missing = codes < 0
+        unseen = missing.sum(axis=1)
+        rows = np.arange(n)
+        for j in range(self.n_features):
+            offset = self.offsets[j]
+            if self.binary[j]:
+                binary_bits[:, offset] = codes[:, j] == 1
+                binary_care[missing[:, j], offset] = False
+            else:
+                seen = ~missing[:, j]
+                onehot_bits[rows[seen], offset + codes[seen, j]] = True
+                onehot_care[missing[:, j], offset:offset + len(self.categories[j])] = False
+        binary_mask = None
+        onehot_mask = None
+        if unseen.any():
+            binary_mask = pack_bits(binary_care)
+            onehot_mask = pack_bits(onehot_care)
+        return pack_bits(binary_bits), pack_bits(onehot_bits), binary_mask, onehot_mask, unseen
+
+    def unpack_train(self):
+        """Recovers the category positions of the training instances from their bit words.
+
+        Returns:
+            numpy.ndarray of int: positions, shape (n_train, n_features)
+
+        Notes:
+            Reads the current layout (binary, offsets), so call it before _layout()
+                changes them; a one-hot feature spans the bits up to the next one's offset.
+        """
+        n = len(self.train[0])
+        binary_bits = np.unpackbits(self.train[0].view(np.uint8), axis=1)
+        onehot_bits = np.unpackbits(self.train[1].view(np.uint8), axis=1)
+        onehot_ends = [offset for offset, binary in zip(self.offsets, self.binary) if not binary][1:]
+        onehot_ends.append(self._n_bits[1])
+        codes = np.empty((n, self.n_features), dtype=np.int64)
+        f = 0
+        for j in range(self.n_features):
+            offset = self.offsets[j]
+            if self.binary[j]:
+                codes[:, j] = binary_bits[:, offset]
+            else:
+                codes[:, j] = np.argmax(onehot_bits[:, offset:onehot_ends[f]], axis=1)
+                f += 1
+        return codes
+
+    def encode(self, X):
+        """Packs instances into bit words (see pack()).
+
+        Args:
+            X(list of list of obj): instances, shape (n_instances, n_features)
+        """
+        return self.pack(self.category_codes(X))
+
+    def extend(self, X):
+        """Adds training instances.
+
+        Args:
+            X(list of list of obj): new training instances, shape (n_new, n_features)
+
+        Notes:
+            Only the new instances are packed, unless they bring new values that
+                change the bit layout; then the training codes are unpacked from the
+                old layout and everything is repacked.
+        """
+        layout = [len(categories) if len(categories) > 2 else 0 for categories in self.categories]
+        new_codes = self.category_codes(X, add=True)
+        if layout == [len(categories) if len(categories) > 2 else 0 for categories in self.categories]:
+            packed = self.pack(new_codes)
+            self.train = tuple(np.concatenate([old, new]) for old, new in zip(self.train, packed[:2]))
+        else:
+            codes = np.concatenate([self.unpack_train(), new_codes])
+            self._layout()
+            self.train = self.pack(codes)[:2]
+
+    def get_state(self):
+        """Returns the encoder as json-ready metadata plus numpy arrays (see from_state()).
+        """
+        meta = {"categories": [[_json_value(value) for value in categories] for categories in self.categories]}
+        arrays = {"binary_words": self.train[0], "onehot_words": self.train[1]}
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        """Rebuilds an encoder from get_state() output.
+        """
+        encoder = cls.__new__(cls)
+        encoder.categories = [{value: i for i, value in enumerate(values)} for values in meta["categories"]]
+        encoder.n_features = len(encoder.categories)
+        encoder._layout()
+        encoder.train = (arrays["binary_words"], arrays["onehot_words"])
+        return encoder
+
+    def distances(self, encoded):
+        """Computes the hamming distance from encoded instances to every training instance.
+
+        Args:
+            encoded(tuple): instances packed by encode()
+
+        Returns:
+            numpy.ndarray: fraction of differing features, shape (n_instances, n_train)
+        """
+        binary, onehot, binary_mask, onehot_mask, unseen = encoded
+        train_binary, train_onehot = self.train
+        mismatches = np.zeros((len(binary), len(train_binary)), dtype=np.int64)
+        for w in range(binary.shape[1]):
+            diff = binary[:, w, None] ^ train_binary[None, :, w]
+            if binary_mask is not None:
+                diff &= binary_mask[:, w, None]
+            mismatches += popcount(diff)
+        onehot_mismatches = np.zeros_like(mismatches)
+        for w in range(onehot.shape[1]):
+            diff = onehot[:, w, None] ^ train_onehot[None, :, w]
+            if onehot_mask is not None:
+                diff &= onehot_mask[:, w, None]
+            onehot_mismatches += popcount(diff)
+        mismatches += onehot_mismatches // 2
+        mismatches += unseen[:, None]
+        return mismatches / max(1, self.n_features)
+
+class MyGowerEncoder:
+    """Encodes mixed categorical/numeric instances for Gower distances.
+
+    Attributes:
+        n_features(int): number of features
+        categorical_features(list of int): indexes of the categorical features
+        numeric_features(list of int): indexes of the numeric features
+        categories(list of dict of obj: int): for each categorical feature, the
+            position of each value seen in training
+        ranges(numpy.ndarray): training range (max - min) of each numeric feature
+        train(tuple of numpy.ndarray): encoded training instances (category codes,
+            numeric values)
+
+    Notes:
+        The distance is the mean over features of: 0/1 for a categorical mismatch, and
+            for a numeric feature the absolute difference divided by its training
+            range, capped at 1 (a feature constant in training counts 0 if equal and
+            1 otherwise).
+    """
+    def __init__(self, X, categorical_features=None):
+        """Initializer for MyGowerEncoder.
+
+        Args:
+            X(list of list of obj): training instances, shape (n_samples, n_features)
+            categorical_features(list of int): indexes of the categorical features
+                (None to treat every feature holding a string as categorical)
+        """
+        self.n_features = len(X[0]) if len(X) else 0
+        if categorical_features is None:
+            categorical_features = [j for j in range(self.n_features)
+                if any(isinstance(row[j], str) for row in X)]
+        self.categorical_features = sorted(categorical_features)
+        self.numeric_features = [j for j in range(self.n_features) if j not in self.categorical_features]
+        self.categories = [{} for _ in self.categorical_features]
+        self.train = self.encode(X, add=True)
+        self._update_ranges()
+
+    def _update_ranges(self):
+        numbers = self.train[1]
+        if len(numbers):
+            self.ranges = numbers.max(axis=0) - numbers.min(axis=0)
+        else:
+            self.ranges = np.zeros(len(self.numeric_features))
+
+    def encode(self, X, add=False):
+        """Encodes instances.
+
+        Args:
+            X(list of list of obj): instances, shape (n_instances, n_features)
+            add(bool): True to add unseen categorical values to the categories
+
+        Returns:
+            tuple: category codes (int, -1 for values unseen in training) and numeric
+                values (float)
+        """
+        codes = np.zeros((len(X), len(self.categorical_features)), dtype=np.int64)
+        for c, j in enumerate(self.categorical_features):
+            codes[:, c] = _category_codes([row[j] for row in X], self.categories[c], add)
+        numbers = np.array([[row[j] for j in self.numeric_features] for row in X], dtype=np.float64)
+        return codes, numbers.reshape(len(X), len(self.numeric_features))
+
+    def extend(self, X):
+        """Adds training instances (the numeric ranges are updated).
+
+        Args:
+            X(list of list of obj): new training instances, shape (n_new, n_features)
+        """
+        encoded = self.encode(X, add=True)
+        self.train = tuple(np.concatenate([old, new]) for old, new in zip(self.train, encoded))
+        self._update_ranges()
+
+    def get_state(self):
+        """Returns the encoder as json-ready metadata plus numpy arrays (see from_state()).
+        """
+        meta = {"categorical_features": self.categorical_features, "n_features": self.n_features,
+            "categories": [[_json_value(value) for value in categories] for categories in self.categories]}
+        arrays = {"codes": self.train[0], "numbers": self.train[1]}
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        """Rebuilds an encoder from get_state() output.
+        """
+        encoder = cls.__new__(cls)
+        encoder.n_features = meta["n_features"]
+        encoder.categorical_features = meta["categorical_features"]
+        encoder.numeric_features = [j for j in range(encoder.n_features)
+            if j not in encoder.categorical_features]
+        encoder.categories = [{value: i for i, value in enumerate(values)} for values in meta["categories"]]
+        encoder.train = (arrays["codes"], arrays["numbers"])
+        encoder._update_ranges()
+        return encoder
+
+    def distances(self, encoded):
+        """Computes the Gower distance from encoded instances to every training instance.
+
+        Args:
+            encoded(tuple): instances encoded by encode()
+
+        Returns:
+            numpy.ndarray: distances in [0, 1], shape (n_instances, n_train)
+        """
+        codes, numbers = encoded
+        train_codes, train_numbers = self.train
+        sums = np.zeros((len(codes), len(train_codes)))
+        for c in range(codes.shape[1]):
+            sums += codes[:, c, None] != train_codes[None, :, c]
+        for j in range(numbers.shape[1]):
+            diff = np.abs(numbers[:, j, None] - train_numbers[None, :, j])
+            if self.ranges[j] > 0:
+                diff /= self.ranges[j]
+                np.minimum(diff, 1, out=diff)
+            else:
+                diff = diff != 0
+            sums += diff
+        return sums / max(1, self.n_features)
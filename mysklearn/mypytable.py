@@ -1,6 +1,632 @@
 from mysklearn import myutils
-import copy
 import csv
+import json
+import os
+import re
+import shutil
+import numpy as np
+
+# cell values treated as missing ("NULL" is what the notebooks' to_csv(na_rep='NULL') writes)
+MISSING_VALUES = ("NA", "N/A", "NULL", "")
+# number of non-missing cells per column looked at when inferring the column type
+SCHEMA_SAMPLE_SIZE = 1000
+# string columns with at most this fraction of distinct values are dictionary-encoded
+CATEGORICAL_MAX_RATIO = 0.5
+# largest magnitude an int column may hold and still round-trip through float
+_MAX_EXACT_INT = 2**53
+# version of the save_binary() directory layout
+BINARY_FORMAT_VERSION = 2
+# directory (next to the CSV) where load_from_file(cache=True) keeps binary copies
+CACHE_DIR_NAME = ".mypytable_cache"
+
+def is_missing(value):
+    """Checks whether a cell value is a missing-value sentinel.
+
+    Args:
+        value(obj): the cell value
+
+    Returns:
+        bool: True for None, NaN, or a string that is empty or one of MISSING_VALUES
+            (ignoring surrounding whitespace)
+    """
+    if isinstance(value, str):
+        return value.strip() in MISSING_VALUES
+    if isinstance(value, float):
+        return value != value
+    return value is None
+
+def _cell_json_value(col_name, value):
+    """Returns a text value or a category as json stores it, keeping numbers numbers.
+
+    Raises:
+        ValueError: if json cannot store the value as it is (save_binary() refuses
+            the column rather than change its values)
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise ValueError("cannot save value %r of column %s" % (value, col_name))
+
+class MyColumn:
+    """Represents one column of a columnar MyPyTable as a typed, contiguous buffer.
+
+    Attributes:
+        kind(str): "int", "float", "categorical" or "text"
+        values(numpy.ndarray): int64 or float64 values for a numeric column, int32 codes
+            into categories for a categorical column (-1 where missing), or an object
+            array of strings for a text column
+        mask(numpy.ndarray of bool): True where the value is missing
+        categories(list of obj): distinct values of a categorical column (None otherwise)
+
+    Notes:
+        Buffers are read-only. Operations that change a column build a new MyColumn,
+            so several tables can safely share the same column objects.
+        Numeric cells are returned as floats whatever the kind, matching convert_to_numeric().
+    """
+    def __init__(self, kind, values, mask, categories=None):
+        """Initializer for MyColumn.
+
+        Args:
+            kind(str): "int", "float", "categorical" or "text"
+            values(numpy.ndarray): values (numeric or text) or codes (categorical)
+            mask(numpy.ndarray of bool): missing-value mask parallel to values
+            categories(list of obj): category values the codes index into
+        """
+        self.kind = kind
+        self.values = values
+        self.mask = mask
+        self.categories = categories
+        self.values.flags.writeable = False
+        self.mask.flags.writeable = False
+
+    @staticmethod
+    def infer_kind(values, sample_size=SCHEMA_SAMPLE_SIZE):
+        """Infers the type of a column from a sample of its non-missing cells.
+
+        Args:
+            values(list of obj): the cells of the column (raw strings or numbers)
+            sample_size(int): number of non-missing cells to look at
+
+        Returns:
+            str: "int" or "float" if every sampled cell parses as a number (int when they
+                are all whole numbers), "categorical" if most of them do or if few of the
+                sampled values are distinct, otherwise "text"
+        """
+        sample = []
+        for value in values:
+            if not is_missing(value):
+                sample.append(value)
+                if len(sample) == sample_size:
+                    break
+        if not sample:
+            return "float"
+
+        parsed = MyColumn._parse_floats(sample)
+        if parsed is not None:
+            return "int" if MyColumn._is_integral(parsed) else "float"
+        # a mostly numeric column with a few stray strings is kept as a (mixed) categorical
+        n_numeric = sum(1 for value in sample if MyColumn._parse_floats([value]) is not None)
+        if n_numeric >= len(sample) / 2 or len(set(sample)) <= CATEGORICAL_MAX_RATIO * len(sample):
+            return "categorical"
+        return "text"
+
+    @staticmethod
+    def from_list(values):
+        """Builds a column from a list of cell values without parsing strings.
+
+        Args:
+            values(list of obj): the cells of the column
+
+        Returns:
+            MyColumn: a numeric column if every non-missing cell is a number,
+                otherwise a categorical or text column of the cells as they are
+        """
+        mask = np.fromiter((is_missing(value) for value in values), dtype=bool, count=len(values))
+        present = [value for value, missing in zip(values, mask) if not missing]
+        if all(isinstance(value, (int, float)) for value in present):
+            return MyColumn._numeric(np.asarray(present, dtype=np.float64), mask)
+        return MyColumn._encode(values, mask)
+
+    @staticmethod
+    def parse(values, kind=None, sample_size=SCHEMA_SAMPLE_SIZE):
+        """Builds a typed column from raw cell values, parsing the whole column at once.
+
+        Args:
+            values(list of obj): the cells of the column (raw strings or numbers)
+            kind(str): column type to parse as (None to infer it with infer_kind())
+            sample_size(int): number of cells sampled when inferring the type
+
+        Returns:
+            MyColumn: the parsed column; missing-value sentinels go into the mask
+
+        Notes:
+            A numeric column that turns out to contain cells that do not parse falls back
+                to a categorical column, where each distinct value is parsed once and the
+                ones that cannot be converted are left as they are.
+            Text columns are never parsed.
+        """
+        if kind is None:
+            kind = MyColumn.infer_kind(values, sample_size)
+        mask = np.fromiter((is_missing(value) for value in values), dtype=bool, count=len(values))
+
+        if kind in ("int", "float"):
+            present = values if not mask.any() else \
+                [value for value, missing in zip(values, mask) if not missing]
+            parsed = MyColumn._parse_floats(present)
+            if parsed is not None:
+                return MyColumn._numeric(parsed, mask)
+            kind = "categorical"
+
+        col = MyColumn._encode(values, mask, force_categorical=(kind == "categorical"))
+        if col.kind == "categorical":
+            return MyColumn._parse_categories(col)
+        return col
+
+    @staticmethod
+    def _parse_floats(values):
+        """Parses a list of cells as float64 in one call.
+
+        Returns:
+            numpy.ndarray: the parsed values, or None if any cell does not parse
+        """
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _is_integral(values):
+        """Checks whether all values are whole numbers that fit exactly in a float.
+        """
+        return bool(np.all(np.floor(values) == values) and np.all(np.abs(values) <= _MAX_EXACT_INT))
+
+    @staticmethod
+    def _numeric(present, mask):
+        """Builds an int or float column from the parsed non-missing values.
+
+        Args:
+            present(numpy.ndarray): float64 values of the non-missing cells, in order
+            mask(numpy.ndarray of bool): missing-value mask of the whole column
+
+        Returns:
+            MyColumn: an "int" column if every value is a whole number, else a "float" column
+        """
+        if MyColumn._is_integral(present):
+            buffer = np.zeros(len(mask), dtype=np.int64)
+            kind = "int"
+        else:
+            buffer = np.zeros(len(mask), dtype=np.float64)
+            kind = "float"
+        buffer[~mask] = present
+        return MyColumn(kind, buffer, mask)
+
+    @staticmethod
+    def _encode(values, mask, force_categorical=False):
+        """Dictionary-encodes a column of (mostly) strings.
+
+        Args:
+            values(list of obj): the cells of the column
+            mask(numpy.ndarray of bool): missing-value mask of the column
+            force_categorical(bool): True to skip the distinct-value check
+
+        Returns:
+            MyColumn: a categorical column, or a text column if too many values are distinct
+        """
+        lookup = {}
+        categories = []
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for i, value in enumerate(values):
+            if mask[i]:
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = len(categories)
+                lookup[value] = code
+                categories.append(value)
+            codes[i] = code
+
+        n_present = len(values) - int(mask.sum())
+        if force_categorical or len(categories) <= CATEGORICAL_MAX_RATIO * n_present:
+            return MyColumn("categorical", codes, mask, categories)
+        text = np.empty(len(values), dtype=object)
+        text[:] = values
+        text[mask] = None
+        return MyColumn("text", text, mask)
+
+    @staticmethod
+    def _parse_categories(col):
+        """Converts the categories of a categorical column to floats where possible.
+
+        Args:
+            col(MyColumn): a categorical column
+
+        Returns:
+            MyColumn: a numeric column if every category parsed, otherwise a categorical
+                column with the parseable categories replaced by floats
+        """
+        parsed = []
+        all_numeric = True
+        for value in col.categories:
+            try:
+                parsed.append(float(value))
+            except (TypeError, ValueError):
+                parsed.append(value)
+                all_numeric = False
+        if all_numeric:
+            lookup = np.array(parsed, dtype=np.float64)
+            return MyColumn._numeric(lookup[col.values[~col.mask]], col.mask)
+        return MyColumn("categorical", col.values, col.mask, parsed)
+
+    def is_numeric(self):
+        """Checks whether the column holds numbers.
+
+        Returns:
+            bool: True for "int" and "float" columns
+        """
+        return self.kind in ("int", "float")
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, index):
+        """Returns a single cell of the column.
+
+        Args:
+            index(int): row index
+
+        Returns:
+            obj: the cell value, or "NA" if it is missing
+        """
+        if self.mask[index]:
+            return "NA"
+        if self.is_numeric():
+            return float(self.values[index])
+        if self.kind == "categorical":
+            return self.categories[self.values[index]]
+        return self.values[index]
+
+    def to_list(self, include_missing_values=True):
+        """Converts the column back to a list of Python values.
+
+        Args:
+            include_missing_values(bool): True if missing values should be included
+                (as "NA"), False if they should be skipped
+
+        Returns:
+            list of obj: the column values
+        """
+        if self.kind == "int":
+            col = self.values.astype(np.float64).tolist()
+        elif self.kind == "categorical":
+            categories = self.categories
+            col = [categories[code] for code in self.values.tolist()]
+        else:
+            col = self.values.tolist()
+        if not self.mask.any():
+            return col
+        if include_missing_values:
+            for i in np.flatnonzero(self.mask).tolist():
+                col[i] = "NA"
+            return col
+        return [value for value, missing in zip(col, self.mask.tolist()) if not missing]
+
+    def take(self, row_indexes):
+        """Builds a new column from the given rows of this one.
+
+        Args:
+            row_indexes(list of int, list of bool, numpy.ndarray, or slice): rows to keep,
+                as indexes in order, a boolean mask, or a slice
+
+        Returns:
+            MyColumn: the selected rows (sharing this column's buffers for a slice)
+        """
+        if not isinstance(row_indexes, slice):
+            row_indexes = np.asarray(row_indexes)
+            if row_indexes.dtype != bool:
+                row_indexes = row_indexes.astype(np.intp, copy=False)
+        return MyColumn(self.kind, self.values[row_indexes], self.mask[row_indexes], self.categories)
+
+    def append(self, values):
+        """Builds a new column with values added at the end of this one.
+
+        Args:
+            values(list of obj): the cells to append
+
+        Returns:
+            MyColumn: the extended column
+        """
+        tail = MyColumn.from_list(values)
+        mask = np.concatenate([self.mask, tail.mask])
+        if self.is_numeric() and tail.is_numeric():
+            kind = "int" if self.kind == tail.kind == "int" else "float"
+            dtype = np.int64 if kind == "int" else np.float64
+            return MyColumn(kind, np.concatenate([self.values, tail.values]).astype(dtype, copy=False), mask)
+        if self.kind == tail.kind == "categorical":
+            categories = list(self.categories)
+            lookup = {value: code for code, value in enumerate(categories)}
+            recode = []
+            for value in tail.categories:
+                if value not in lookup:
+                    lookup[value] = len(categories)
+                    categories.append(value)
+                recode.append(lookup[value])
+            recode = np.array(recode + [-1], dtype=np.int32)
+            return MyColumn("categorical", np.concatenate([self.values, recode[tail.values]]), mask, categories)
+        if self.kind == tail.kind == "text":
+            return MyColumn("text", np.concatenate([self.values, tail.values]), mask)
+        return MyColumn.from_list(self.to_list() + list(values))
+
+    def present_values(self):
+        """Returns the non-missing values of a numeric column.
+
+        Returns:
+            numpy.ndarray: float64 values with missing entries removed
+
+        Raises:
+            ValueError: if the column is not numeric (its values would be codes or strings)
+        """
+        if not self.is_numeric():
+            raise ValueError("present_values() needs a numeric column, not a " + self.kind + " one")
+        values = self.values
+        if self.kind == "int":
+            values = values.astype(np.float64)
+        if self.mask.any():
+            return values[~self.mask]
+        return values
+
+class MyIndex:
+    """Represents a hash index from key-column values to the rows holding them.
+
+    Attributes:
+        key_column_names(list of str): column names used as row keys
+        positions(dict of tuple: list of int): ascending row indexes of each key
+        stale(bool): True if the table may have changed in a way the index has not seen
+
+    Notes:
+        Build one with MyPyTable.create_index(); the table keeps it up to date as rows
+            are appended or dropped, and rebuilds it lazily after other edits.
+    """
+    def __init__(self, key_column_names):
+        """Initializer for MyIndex.
+
+        Args:
+            key_column_names(list of str): column names used as row keys
+        """
+        self.key_column_names = list(key_column_names)
+        self.positions = {}
+        self.stale = True
+
+    def build(self, keys):
+        """Rebuilds the index from scratch.
+
+        Args:
+            keys(iterable of tuple): the key of every row, in row order
+        """
+        positions = {}
+        for i, key in enumerate(keys):
+            found = positions.get(key)
+            if found is None:
+                positions[key] = [i]
+            else:
+                found.append(i)
+        self.positions = positions
+        self.stale = False
+
+    def add(self, first_row_index, keys):
+        """Adds rows appended at the end of the table.
+
+        Args:
+            first_row_index(int): row index of the first appended row
+            keys(iterable of tuple): the keys of the appended rows, in order
+        """
+        for i, key in enumerate(keys, first_row_index):
+            self.positions.setdefault(key, []).append(i)
+
+    def compact(self, keep):
+        """Renumbers the rows after the table dropped some of them.
+
+        Args:
+            keep(numpy.ndarray of bool): True for the rows that were kept (old numbering)
+        """
+        new_index = (np.cumsum(keep) - 1).tolist()
+        keep = keep.tolist()
+        positions = {}
+        for key, rows in self.positions.items():
+            kept = [new_index[i] for i in rows if keep[i]]
+            if kept:
+                positions[key] = kept
+        self.positions = positions
+
+    def get(self, key):
+        """Looks up the rows with a given key.
+
+        Args:
+            key(tuple): values of the key columns, in key_column_names order
+
+        Returns:
+            list of int: ascending row indexes (empty if the key is not present)
+        """
+        return self.positions.get(tuple(key), [])
+
+class MyGroupBy:
+    """Represents the rows of a MyPyTable grouped on one or more key columns.
+
+    Attributes:
+        table(MyPyTable): the grouped table
+        key_column_names(list of str): column names the rows are grouped on
+        keys(list of tuple): the key of each group, sorted with missing key values last
+            when the other values are comparable (otherwise in order of first appearance)
+        group_ids(numpy.ndarray of int): the group (index into keys) of each row
+
+    Notes:
+        Groups are found with one hash-table pass over the key columns; each aggregate
+            is then a vectorized reduction over group_ids. Missing values are skipped by
+            the aggregates, but a missing key value ("NA") forms a group of its own.
+    """
+    AGGREGATES = ("count", "sum", "mean", "min", "max", "distinct")
+
+    def __init__(self, table, key_column_names):
+        """Initializer for MyGroupBy.
+
+        Args:
+            table(MyPyTable): the table to group
+            key_column_names(list of str): column names to group on
+        """
+        self.table = table
+        self.key_column_names = list(key_column_names)
+        row_keys = table._row_keys([table._column_index(name) for name in self.key_column_names])
+
+        lookup = {}
+        first_ids = np.empty(len(row_keys), dtype=np.intp)
+        for i, key in enumerate(row_keys):
+            group = lookup.get(key)
+            if group is None:
+                group = len(lookup)
+                lookup[key] = group
+            first_ids[i] = group
+
+        def sort_key(key):
+            # a missing value sorts after every present one instead of breaking the sort
+            return tuple((is_missing(v), 0 if is_missing(v) else v) for v in key)
+
+        keys = list(lookup)
+        try:
+            order = sorted(range(len(keys)), key=lambda g: sort_key(keys[g]))
+        except TypeError:
+            order = list(range(len(keys)))
+        rank = np.empty(len(keys), dtype=np.intp)
+        rank[order] = np.arange(len(keys))
+        self.keys = [keys[g] for g in order]
+        self.group_ids = rank[first_ids] if len(keys) else first_ids
+
+    def size(self):
+        """Counts the rows of each group.
+
+        Returns:
+            MyPyTable: the key columns followed by a "count" column, one row per group
+        """
+        counts = np.bincount(self.group_ids, minlength=len(self.keys)).tolist()
+        return self._result(["count"], [counts])
+
+    def agg(self, aggregations):
+        """Computes aggregates of columns for each group.
+
+        Args:
+            aggregations(dict of str: str or list of str): for each column name, one or more
+                of "count", "sum", "mean", "min", "max" and "distinct" (number of distinct
+                non-missing values)
+
+        Returns:
+            MyPyTable: the key columns followed by one "<column>_<aggregate>" column per
+                requested aggregate, one row per group (sum, mean, min and max are "NA"
+                where a group has no values in the column; count and distinct are 0)
+        """
+        names = []
+        results = []
+        for col_name, funcs in aggregations.items():
+            if isinstance(funcs, str):
+                funcs = [funcs]
+            col = self._column(col_name)
+            for func in funcs:
+                if func not in MyGroupBy.AGGREGATES:
+                    raise ValueError("unknown aggregate: " + str(func))
+                names.append(col_name + "_" + func)
+                results.append(self._aggregate(col, func))
+        return self._result(names, results)
+
+    def frequencies(self, col_name):
+        """Builds the frequency table of a column within each group.
+
+        Args:
+            col_name(str): the column to count
+
+        Returns:
+            MyPyTable: the key columns followed by col_name and "count", one row per
+                (group, value) pair, with values sorted within each group when comparable
+        """
+        values = self._column(col_name).to_list()
+        counts = {}
+        for group, value in zip(self.group_ids.tolist(), values):
+            counts[(group, value)] = counts.get((group, value), 0) + 1
+        pairs = list(counts)
+        try:
+            pairs.sort()
+        except TypeError:
+            pairs.sort(key=lambda pair: pair[0])
+
+        table = MyPyTable(column_names=self.key_column_names + [col_name, "count"])
+        table.data = [list(self.keys[group]) + [value, counts[(group, value)]] for group, value in pairs]
+        return table
+
+    def _column(self, col_name):
+        """Returns a column of the grouped table as a MyColumn.
+        """
+        if self.table.is_columnar():
+            return self.table.get_column_view(col_name)
+        return MyColumn.from_list(self.table.get_column(col_name))
+
+    def _aggregate(self, col, func):
+        """Computes one aggregate of a column for every group.
+
+        Args:
+            col(MyColumn): the column, parallel to the rows of the table
+            func(str): one of AGGREGATES
+
+        Returns:
+            list of obj: the aggregate of each group
+        """
+        n_groups = len(self.keys)
+        present = ~col.mask
+        ids = self.group_ids[present]
+        counts = np.bincount(ids, minlength=n_groups)
+        if func == "count":
+            return counts.tolist()
+        if func == "distinct":
+            if col.kind in ("int", "float", "categorical"):
+                pairs = set(zip(ids.tolist(), col.values[present].tolist()))
+            else:
+                pairs = set(zip(ids.tolist(), col.to_list(include_missing_values=False)))
+            distinct = np.zeros(n_groups, dtype=np.intp)
+            for group, _ in pairs:
+                distinct[group] += 1
+            return distinct.tolist()
+
+        if not col.is_numeric():
+            return self._aggregate_objects(col.to_list(include_missing_values=False), ids, func)
+        values = col.present_values()
+        if func in ("sum", "mean"):
+            sums = np.bincount(ids, weights=values, minlength=n_groups)
+            if func == "sum":
+                result = sums
+            else:
+                result = np.divide(sums, counts, out=np.zeros(n_groups), where=counts > 0)
+        elif func == "min":
+            result = np.full(n_groups, np.inf)
+            np.minimum.at(result, ids, values)
+        else:
+            result = np.full(n_groups, -np.inf)
+            np.maximum.at(result, ids, values)
+        return [value if count else "NA" for value, count in zip(result.tolist(), counts.tolist())]
+
+    def _aggregate_objects(self, values, ids, func):
+        """Computes min or max of a non-numeric column for every group.
+        """
+        if func not in ("min", "max"):
+            raise ValueError(func + " needs a numeric column")
+        best = [None] * len(self.keys)
+        pick = min if func == "min" else max
+        for group, value in zip(ids.tolist(), values):
+            best[group] = value if best[group] is None else pick(best[group], value)
+        return ["NA" if value is None else value for value in best]
+
+    def _result(self, names, results):
+        """Builds the result table from the group keys and per-group columns.
+        """
+        table = MyPyTable(column_names=self.key_column_names + names)
+        table.data = [list(key) + list(values) for key, values in zip(self.keys, zip(*results))] \
+            if results else [list(key) for key in self.keys]
+        return table
 
 class MyPyTable:
     """Represents a 2D table of data with column names.
@@ -9,21 +635,323 @@ class MyPyTable:
         column_names(list of str): M column names
         data(list of list of obj): 2D data structure storing mixed type data.
             There are N rows by M columns
+
+    Notes:
+        A table is stored either as a list of rows (the default) or, in columnar mode,
+            as one MyColumn per column. Accessing data on a columnar table converts it
+            back to rows so that in-place edits of the rows keep working.
+        Tables made with view() share storage with their parent. Shared rows are
+            copied the first time either table hands out its data (copy-on-write);
+            column buffers are read-only, so columnar tables never need to copy them.
+        Reading data marks every index from create_index() as stale, even if the rows
+            are only read: the caller gets the live row lists and may edit them in
+            place, which the table cannot see. The next lookup then rebuilds the index.
+            To keep an index across lookups, read through get_column(), or through
+            the data of a view() (copy-on-write, so the parent's indexes stay valid).
     """
 
-    def __init__(self, column_names=None, data=None):
+    def __init__(self, column_names=None, data=None, columnar=False):
         """Initializer for MyPyTable.
 
         Args:
             column_names(list of str): initial M column names (None if empty)
             data(list of list of obj): initial table data in shape NxM (None if empty)
+            columnar(bool): True to store the table as typed columns
+
+        Notes:
+            The rows are copied one level deep, so the table does not share row lists
+                with the caller (cells are numbers or strings and are never mutated).
         """
         if column_names is None:
             column_names = []
-        self.column_names = copy.deepcopy(column_names)
+        self.column_names = list(column_names)
         if data is None:
             data = []
-        self.data = copy.deepcopy(data)
+        self._rows = [list(row) for row in data]
+        self._columns = None
+        self._shared_rows = False
+        self._indexes = {}
+        if columnar:
+            self.to_columnar()
+
+    @property
+    def data(self):
+        """The rows of the table (list of list of obj).
+
+        Notes:
+            Side effect: every read marks the table's indexes as stale (see the class
+                notes), so a loop like "for row in table.data" makes the next
+                find_rows() or join rebuild its index.
+        """
+        if self._columns is not None:
+            self.to_rows()
+        if self._shared_rows:
+            # the caller may edit the rows in place, so stop sharing them first
+            self._rows = [list(row) for row in self._rows]
+            self._shared_rows = False
+        self._invalidate_indexes()
+        return self._rows
+
+    @data.setter
+    def data(self, data):
+        self._rows = data
+        self._columns = None
+        self._shared_rows = False
+        self._invalidate_indexes()
+
+    def copy(self):
+        """Returns an independent copy of the table.
+
+        Returns:
+            MyPyTable: a table with its own rows (or its own column buffers)
+        """
+        newTable = MyPyTable(column_names=self.column_names)
+        if self._columns is not None:
+            newTable._columns = [MyColumn(col.kind, col.values.copy(), col.mask.copy(),
+                None if col.categories is None else list(col.categories)) for col in self._columns]
+            newTable._rows = None
+        else:
+            newTable.data = [list(row) for row in self._rows]
+        return newTable
+
+    def view(self, row_indexes=None, col_names=None):
+        """Returns a table that shares this table's storage instead of copying it.
+
+        Args:
+            row_indexes(list of int, list of bool, or slice): rows to keep, as indexes,
+                a boolean mask parallel to the rows, or a slice (None for all rows)
+            col_names(list of str): columns to keep, in order (None for all columns)
+
+        Returns:
+            MyPyTable: the selected rows and columns
+
+        Notes:
+            In columnar mode the selected columns are the parent's MyColumn objects, and a
+                slice of rows is a numpy view of their buffers; other row selections
+                gather just the selected rows.
+            In row mode a row selection shares the parent's row lists until either table
+                hands out its data; a column projection builds new (shallow) rows.
+        """
+        if col_names is None:
+            col_indexes = list(range(len(self.column_names)))
+        else:
+            col_indexes = [self._column_index(name) for name in col_names]
+        newTable = MyPyTable(column_names=[self.column_names[j] for j in col_indexes])
+
+        if self._columns is not None:
+            columns = [self._columns[j] for j in col_indexes]
+            if row_indexes is not None:
+                columns = [col.take(row_indexes) for col in columns]
+            newTable._columns = columns
+            newTable._rows = None
+            return newTable
+
+        rows = self._rows
+        if isinstance(row_indexes, slice):
+            rows = rows[row_indexes]
+        elif row_indexes is not None:
+            row_indexes = list(row_indexes)
+            if row_indexes and isinstance(row_indexes[0], (bool, np.bool_)):
+                rows = [row for row, keep in zip(rows, row_indexes) if keep]
+            else:
+                rows = [rows[i] for i in row_indexes]
+        if col_names is None:
+            newTable._rows = list(rows)
+            newTable._shared_rows = True
+            self._shared_rows = True
+        else:
+            newTable._rows = [[row[j] for j in col_indexes] for row in rows]
+        return newTable
+
+    def create_index(self, key_column_names):
+        """Builds a hash index on key columns and keeps it with the table.
+
+        Args:
+            key_column_names(list of str): column names to use as row keys
+
+        Returns:
+            MyIndex: the index, which find_duplicates(), the joins and find_rows()
+                reuse whenever they are called with the same key_column_names
+
+        Notes:
+            The index is updated in place by append_rows(), filter() and drop_rows();
+                any other change to the table makes it rebuild on its next use.
+        """
+        index = MyIndex(key_column_names)
+        index.build(self._row_keys([self._column_index(name) for name in key_column_names]))
+        self._indexes[tuple(key_column_names)] = index
+        return index
+
+    def drop_index(self, key_column_names):
+        """Removes the index on key_column_names (if there is one).
+
+        Args:
+            key_column_names(list of str): column names of the index
+        """
+        self._indexes.pop(tuple(key_column_names), None)
+
+    def get_index(self, key_column_names):
+        """Returns the up-to-date index on key_column_names, if one was created.
+
+        Args:
+            key_column_names(list of str): column names of the index
+
+        Returns:
+            MyIndex: the index, or None if create_index() was not called for these keys
+        """
+        index = self._indexes.get(tuple(key_column_names))
+        if index is not None and index.stale:
+            index.build(self._row_keys([self._column_index(name) for name in key_column_names]))
+        return index
+
+    def find_rows(self, key_column_names, key):
+        """Finds the rows whose key columns hold the given values.
+
+        Args:
+            key_column_names(list of str): column names to use as row keys
+            key(obj or list of obj): the key values (a single value for a single key column)
+
+        Returns:
+            list of int: ascending indexes of the matching rows
+
+        Notes:
+            Uses the index on key_column_names if there is one, otherwise scans the table.
+        """
+        if not isinstance(key, (list, tuple)):
+            key = (key,)
+        key = tuple(key)
+        index = self.get_index(key_column_names)
+        if index is not None:
+            return list(index.get(key))
+        key_indexes = [self._column_index(name) for name in key_column_names]
+        return [i for i, row_key in enumerate(self._row_keys(key_indexes)) if row_key == key]
+
+    def append_rows(self, rows):
+        """Adds rows at the end of the table.
+
+        Args:
+            rows(list of list of obj): the new rows, in the table's column order
+        """
+        n_rows = self.get_shape()[0]
+        if self._columns is not None:
+            if rows:
+                self._columns = [col.append(list(values)) for col, values in zip(self._columns, zip(*rows))]
+        else:
+            self._rows.extend([list(row) for row in rows])
+        for key_column_names, index in self._indexes.items():
+            if not index.stale:
+                key_indexes = [self._column_index(name) for name in key_column_names]
+                if self._columns is not None:
+                    # read the keys back from the columns so they are normalized the
+                    # same way build() sees them (e.g. "" -> "NA", "3" -> 3.0)
+                    tails = [self._columns[j].take(slice(n_rows, None)).to_list() for j in key_indexes]
+                    index.add(n_rows, list(zip(*tails)))
+                else:
+                    index.add(n_rows, [tuple([row[j] for j in key_indexes]) for row in rows])
+
+    def _row_keys(self, key_indexes):
+        """Returns the key tuple of every row.
+
+        Args:
+            key_indexes(list of int): indexes of the key columns
+
+        Returns:
+            list of tuple: the key of each row, in row order
+        """
+        if self._columns is not None:
+            if not self.column_names:
+                return []
+            return list(zip(*[self._columns[j].to_list() for j in key_indexes]))
+        return [tuple([row[j] for j in key_indexes]) for row in self._rows]
+
+    def _invalidate_indexes(self):
+        """Marks every index as stale after a change the indexes cannot follow.
+        """
+        for index in self._indexes.values():
+            index.stale = True
+
+    def is_columnar(self):
+        """Checks whether the table is currently stored as typed columns.
+
+        Returns:
+            bool: True if the table is in columnar mode
+        """
+        return self._columns is not None
+
+    def to_columnar(self):
+        """Converts the table to columnar storage (one MyColumn per column).
+
+        Returns:
+            MyPyTable: return self so the caller can chain calls
+        """
+        if self._columns is None:
+            if self._rows:
+                cols = [list(col) for col in zip(*self._rows)]
+            else:
+                cols = [[] for _ in self.column_names]
+            self._columns = [MyColumn.from_list(col) for col in cols]
+            self._rows = None
+        return self
+
+    def to_rows(self):
+        """Converts the table back to row storage (list of row lists).
+
+        Returns:
+            MyPyTable: return self so the caller can chain calls
+        """
+        if self._columns is not None:
+            self._rows = self._row_list()
+            self._columns = None
+            self._shared_rows = False
+        return self
+
+    def _row_list(self):
+        """Returns the rows of the table without changing its storage mode.
+
+        Returns:
+            list of list of obj: the rows (freshly built for a columnar table)
+        """
+        if self._columns is None:
+            return self._rows
+        if not self._columns:
+            return []
+        return [list(row) for row in zip(*[col.to_list() for col in self._columns])]
+
+    def _column_index(self, col_identifier):
+        """Resolves a column name or index to a column index.
+
+        Args:
+            col_identifier(str or int): string for a column name or int
+                for a column index
+
+        Returns:
+            int: the column index
+
+        Notes:
+            Raise ValueError on invalid col_identifier
+        """
+        if isinstance(col_identifier, int) and not isinstance(col_identifier, bool):
+            if 0 <= col_identifier < len(self.column_names):
+                return col_identifier
+            raise ValueError("invalid column index: " + str(col_identifier))
+        return self.column_names.index(col_identifier)
+
+    def get_column_view(self, col_identifier):
+        """Returns the stored MyColumn for a column without copying it.
+
+        Args:
+            col_identifier(str or int): string for a column name or int
+                for a column index
+
+        Returns:
+            MyColumn: the column buffer and its missing-value mask
+
+        Notes:
+            Converts the table to columnar storage if needed.
+        """
+        index = self._column_index(col_identifier)
+        self.to_columnar()
+        return self._columns[index]
 
     def get_shape(self):
         """Computes the dimension of the table (N x M).
@@ -32,7 +960,10 @@ class MyPyTable:
             int: number of rows in the table (N)
             int: number of cols in the table (M)
         """
-        return len(self.data), len(self.column_names)
+        if self._columns is not None:
+            n_rows = len(self._columns[0]) if self._columns else 0
+            return n_rows, len(self.column_names)
+        return len(self._rows), len(self.column_names)
 
     def get_column(self, col_identifier, include_missing_values=True):
         """Extracts a column from the table data as a list.
@@ -49,62 +980,175 @@ class MyPyTable:
         Notes:
             Raise ValueError on invalid col_identifier
         """
+        index = self._column_index(col_identifier)
+        if self._columns is not None:
+            return self._columns[index].to_list(include_missing_values)
+
         col = []
-        index = self.column_names.index(col_identifier)
-        
-        for row in self.data:
-            j = 0
-            while j < len(row):
-                if j == index and row[j] == '' and include_missing_values:
+        for row in self._rows:
+            value = row[index]
+            if is_missing(value):
+                if include_missing_values:
                     col.append('NA')
-                    j+=1
-                elif j == index:
-                    col.append(row[j])
-                    j+=1
-                else:
-                    j+=1
-                    continue
+            else:
+                col.append(value)
 
         return col
 
-    def convert_to_numeric(self):
+    def infer_schema(self, sample_size=SCHEMA_SAMPLE_SIZE):
+        """Infers the type of each column from a sample of its non-missing cells.
+
+        Args:
+            sample_size(int): number of non-missing cells to look at per column
+
+        Returns:
+            list of str: "int", "float", "categorical" or "text" for each column
+                (parallel to column_names)
+        """
+        if self._columns is not None:
+            schema = []
+            for col in self._columns:
+                if col.kind == "categorical":
+                    kind = MyColumn.infer_kind(col.categories, sample_size)
+                    schema.append(kind if kind in ("int", "float") else "categorical")
+                elif col.kind == "text":
+                    schema.append(MyColumn.infer_kind(col.values[~col.mask][:sample_size], sample_size))
+                else:
+                    schema.append(col.kind)
+            return schema
+
+        return [MyColumn.infer_kind((row[j] for row in self._rows), sample_size)
+            for j in range(len(self.column_names))]
+
+    def convert_to_numeric(self, schema=None):
         """Try to convert each value in the table to a numeric type (float).
 
+        Args:
+            schema(list of str): column types to parse the columns as, parallel to
+                column_names (None to infer them with infer_schema())
+
         Notes:
             Leave values as is that cannot be converted to numeric.
+            Each column's type is picked once and the whole column is then parsed in bulk;
+                text columns (mostly distinct strings) are not parsed at all.
+            Missing-value sentinels (MISSING_VALUES) go into the column masks in columnar
+                mode and become "NA" in row mode.
         """
-        newData = []
-
-        for row in self.data:
-            newRow = []
-            for item in row:
-                try:
-                    newItem = float(item)
-                    newRow.append(newItem)
-                except:
-                    newRow.append(item)
-            newData.append(newRow)
+        if schema is None:
+            schema = self.infer_schema()
+
+        if self._columns is not None:
+            newColumns = []
+            for col, kind in zip(self._columns, schema):
+                if col.kind == "categorical":
+                    # the dictionary holds each distinct value once, so parse that instead
+                    col = MyColumn._parse_categories(col)
+                elif col.kind == "text" and kind != "text":
+                    col = MyColumn.parse(col.to_list(), kind)
+                newColumns.append(col)
+            self._columns = newColumns
+            self._invalidate_indexes()
+            return
+
+        if not self._rows:
+            return
+        newCols = []
+        for j, col in enumerate(zip(*self._rows)):
+            newCols.append(MyColumn.parse(list(col), schema[j]).to_list())
+        self.data = [list(row) for row in zip(*newCols)]
 
-        self.data = newData
-                
     def drop_rows(self, row_indexes_to_drop):
         """Remove rows from the table data.
 
         Args:
-            row_indexes_to_drop(list of int): list of row indexes to remove from the table data.
+            row_indexes_to_drop(list of int or list of bool): list of row indexes to remove
+                from the table data, or a boolean mask that is True for the rows to remove.
+
+        Notes:
+            The table is compacted in a single pass.
+        """
+        self.filter(~self._row_mask(row_indexes_to_drop))
+
+    def filter(self, row_selector):
+        """Keep only the selected rows of the table data.
+
+        Args:
+            row_selector(list of bool or list of int): boolean mask parallel to the rows
+                that is True for the rows to keep, or the indexes of the rows to keep.
+
+        Returns:
+            MyPyTable: return self so the caller can chain calls
+
+        Notes:
+            The table is compacted in a single pass and the kept rows stay in order.
         """
-        i=0 
-        while i<len(row_indexes_to_drop):
-            self.data.pop(row_indexes_to_drop[i])
-            for j in range(len(row_indexes_to_drop)):
-                row_indexes_to_drop[j]-=1
-            i+=1
-            
-    def load_from_file(self, filename):
+        keep = self._row_mask(row_selector)
+        for index in self._indexes.values():
+            if not index.stale:
+                index.compact(keep)
+        if self._columns is not None:
+            if not keep.all():
+                self._columns = [col.take(keep) for col in self._columns]
+        else:
+            # only the outer list is rebuilt, so rows shared with a view stay shared
+            self._rows = [row for row, kept in zip(self._rows, keep.tolist()) if kept]
+        return self
+
+    def _row_mask(self, row_selector):
+        """Converts a row selector to a boolean mask over the rows of the table.
+
+        Args:
+            row_selector(list of bool or list of int): boolean mask or row indexes
+
+        Returns:
+            numpy.ndarray of bool: True for the selected rows
+        """
+        n_rows = self.get_shape()[0]
+        row_selector = np.asarray(row_selector)
+        if row_selector.dtype == bool:
+            if len(row_selector) != n_rows:
+                raise ValueError("row mask length does not match the number of rows")
+            return row_selector
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[row_selector.astype(np.intp)] = True
+        return mask
+
+    def missing_mask(self, col_names=None):
+        """Finds the rows that contain a missing value.
+
+        Args:
+            col_names(list of str): columns to check (None for all columns)
+
+        Returns:
+            numpy.ndarray of bool: True for each row with a missing value ("NA", "N/A",
+                "NULL" or empty) in one of the checked columns
+        """
+        if col_names is None:
+            col_indexes = list(range(len(self.column_names)))
+        else:
+            col_indexes = [self._column_index(name) for name in col_names]
+
+        if self._columns is not None:
+            missing = np.zeros(self.get_shape()[0], dtype=bool)
+            for j in col_indexes:
+                missing |= self._columns[j].mask
+            return missing
+
+        if col_names is None:
+            rows = self._rows
+        else:
+            rows = ([row[j] for j in col_indexes] for row in self._rows)
+        return np.fromiter((any(map(is_missing, row)) for row in rows), dtype=bool, count=len(self._rows))
+
+    def load_from_file(self, filename, columnar=False, cache=False, cache_dir=None):
         """Load column names and data from a CSV file.
 
         Args:
             filename(str): relative path for the CSV file to open and load the contents of.
+            columnar(bool): True to load the table into typed columns
+            cache(bool): True to reuse (or create) a binary copy of the parsed file
+            cache_dir(str): directory for the binary copies (None for a
+                ".mypytable_cache" directory next to the CSV file)
 
         Returns:
             MyPyTable: return self so the caller can write code like
@@ -114,7 +1158,27 @@ class MyPyTable:
             Use the csv module.
             First row of CSV file is assumed to be the header.
             Calls convert_to_numeric() after load
+            With cache=True, the binary copy is keyed on the CSV's size and modification
+                time: while the CSV is unchanged the table is memory-mapped from the copy
+                instead of being parsed, and a changed CSV is parsed again and re-cached.
         """
+        if cache:
+            entry = MyPyTable._cache_entry(filename, cache_dir)
+            loaded = False
+            if os.path.exists(os.path.join(entry, "header.json")):
+                try:
+                    self._load_binary_into(entry, mmap=True)
+                    loaded = True
+                except ValueError:
+                    # written by another version of the format: parse and cache again
+                    shutil.rmtree(entry, ignore_errors=True)
+            if not loaded:
+                self.load_from_file(filename, columnar=True)
+                MyPyTable._store_cache_entry(self, entry)
+            if not columnar:
+                self.to_rows()
+            return self
+
         file = open(filename, 'r')
         csvRead = csv.reader(file)
 
@@ -129,10 +1193,251 @@ class MyPyTable:
 
         self.data = data
         self.column_names = header
+        if columnar:
+            # dictionary-encode the raw strings first so each distinct value is parsed once
+            self.to_columnar()
         self.convert_to_numeric()
 
         return self
 
+    def save_binary(self, dirname):
+        """Save the table in the binary column format.
+
+        Args:
+            dirname(str): directory to write (created if needed, existing files are replaced)
+
+        Notes:
+            The directory holds a header.json with the column names, types, categories
+                and file names, plus one .npy file per column buffer and per missing-value
+                mask. Every buffer can be memory-mapped by load_binary().
+            A text column is stored like a categorical one: int32 codes plus its distinct
+                values in header.json, so numbers in a mixed column come back as numbers.
+                A ValueError is raised for a value json cannot store as it is, before
+                anything is written.
+            header.json is written last (through a temporary file and a rename), so a
+                save that fails part way leaves no directory load_binary() would accept.
+        """
+        columns = self._columns
+        if columns is None:
+            columns = self.view().to_columnar()._columns
+
+        # build (and validate) the whole header before writing anything
+        buffers = []
+        header = {"version": BINARY_FORMAT_VERSION, "n_rows": self.get_shape()[0], "columns": []}
+        for j, (name, col) in enumerate(zip(self.column_names, columns)):
+            values = col.values
+            text_values = None
+            if col.kind == "text":
+                # codes into the distinct values, so the buffer stays memory-mappable
+                # and the values keep their types
+                position = {}
+                codes = np.full(len(values), -1, dtype=np.int32)
+                for i, (value, missing) in enumerate(zip(values.tolist(), col.mask.tolist())):
+                    if not missing:
+                        codes[i] = position.setdefault(value, len(position))
+                text_values = [_cell_json_value(name, value) for value in position]
+                values = codes
+            categories = None
+            if col.categories is not None:
+                categories = [_cell_json_value(name, value) for value in col.categories]
+            entry = {"name": name, "kind": col.kind, "values": "col%d.values.npy" % j, "mask": None,
+                "categories": categories, "text_values": text_values}
+            buffers.append((entry["values"], values))
+            if col.mask.any():
+                entry["mask"] = "col%d.mask.npy" % j
+                buffers.append((entry["mask"], col.mask))
+            header["columns"].append(entry)
+        header_text = json.dumps(header)
+
+        os.makedirs(dirname, exist_ok=True)
+        header_path = os.path.join(dirname, "header.json")
+        if os.path.exists(header_path):
+            # the old header must not describe a mix of old and new buffers
+            os.remove(header_path)
+        for filename, buffer in buffers:
+            np.save(os.path.join(dirname, filename), buffer, allow_pickle=False)
+        with open(header_path + ".tmp", 'w') as file:
+            file.write(header_text)
+        os.replace(header_path + ".tmp", header_path)
+
+    def load_binary(self, dirname, mmap=True):
+        """Load a table saved with save_binary().
+
+        Args:
+            dirname(str): directory written by save_binary()
+            mmap(bool): True to memory-map the column buffers (read lazily by the OS),
+                False to read them into memory
+
+        Returns:
+            MyPyTable: return self (in columnar mode) so the caller can write code like
+                table = MyPyTable().load_binary(dirname)
+        """
+        self._load_binary_into(dirname, mmap)
+        return self
+
+    def _load_binary_into(self, dirname, mmap):
+        """Replaces the contents of the table with a save_binary() directory.
+
+        Args:
+            dirname(str): directory written by save_binary()
+            mmap(bool): True to memory-map the column buffers
+        """
+        with open(os.path.join(dirname, "header.json"), 'r') as file:
+            header = json.load(file)
+        if header.get("version") != BINARY_FORMAT_VERSION:
+            raise ValueError("unsupported binary table version: " + str(header.get("version")))
+
+        mmap_mode = 'r' if mmap else None
+        n_rows = header["n_rows"]
+        columns = []
+        for entry in header["columns"]:
+            values = np.load(os.path.join(dirname, entry["values"]), mmap_mode=mmap_mode, allow_pickle=False)
+            if entry["kind"] == "text":
+                # missing cells (code -1) read the "" at the end
+                lookup = np.empty(len(entry["text_values"]) + 1, dtype=object)
+                lookup[:-1] = entry["text_values"]
+                lookup[-1] = ""
+                values = lookup[values]
+            if entry["mask"] is None:
+                mask = np.zeros(n_rows, dtype=bool)
+            else:
+                mask = np.load(os.path.join(dirname, entry["mask"]), mmap_mode=mmap_mode, allow_pickle=False)
+            columns.append(MyColumn(entry["kind"], values, mask, entry["categories"]))
+
+        self.column_names = [entry["name"] for entry in header["columns"]]
+        self._rows = None
+        self._columns = columns
+        self._shared_rows = False
+        self._invalidate_indexes()
+
+    @staticmethod
+    def _cache_entry(filename, cache_dir):
+        """Returns the cache directory of a CSV file's current contents.
+
+        Args:
+            filename(str): path of the CSV file
+            cache_dir(str): cache root (None for CACHE_DIR_NAME next to the file)
+
+        Returns:
+            str: path of the cache entry, named after the file, its size and its
+                modification time (in ns)
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR_NAME)
+        stat = os.stat(filename)
+        return os.path.join(cache_dir, "%s.%d-%d" % (os.path.basename(filename), stat.st_size, stat.st_mtime_ns))
+
+    @staticmethod
+    def _store_cache_entry(table, entry):
+        """Writes a cache entry and removes the older entries of the same file.
+
+        Args:
+            table(MyPyTable): the parsed table
+            entry(str): path from _cache_entry()
+
+        Notes:
+            Only names of the form <basename>.<size>-<mtime> are removed, so entries of
+                other files (e.g. "SPS.csv.bak") and other writers' staging directories
+                are left alone.
+        """
+        cache_dir, name = os.path.split(entry)
+        basename = name[:name.rindex(".")]
+        pattern = re.compile(re.escape(basename) + r"\.\d+-\d+")
+        os.makedirs(cache_dir, exist_ok=True)
+        for old in os.listdir(cache_dir):
+            if pattern.fullmatch(old) and old != name:
+                shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+
+        # write next to the final location, then rename, so readers never see half an entry
+        staging = entry + ".tmp%d" % os.getpid()
+        try:
+            table.save_binary(staging)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @staticmethod
+    def iter_chunks(filename, chunk_rows=10000, columnar=False):
+        """Stream a CSV file as a sequence of converted MyPyTable chunks.
+
+        Args:
+            filename(str): relative path for the CSV file to read
+            chunk_rows(int): maximum number of rows per chunk
+            columnar(bool): True to store each chunk as typed columns
+
+        Yields:
+            MyPyTable: the next batch of at most chunk_rows rows, with the file's
+                column names, already passed through convert_to_numeric()
+
+        Notes:
+            Only one chunk is held in memory at a time. Combine the chunks with the
+                accumulators in mysklearn.mystats to compute whole-file aggregates.
+            The column types are inferred from the first chunk and reused for the rest,
+                so every chunk is parsed the same way.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+
+        with open(filename, 'r', newline='') as file:
+            csvRead = csv.reader(file)
+            header = next(csvRead)
+
+            schema = None
+            batch = []
+            for row in csvRead:
+                batch.append(row)
+                if len(batch) == chunk_rows:
+                    table, schema = MyPyTable._chunk_table(header, batch, columnar, schema)
+                    yield table
+                    batch = []
+            if batch:
+                table, schema = MyPyTable._chunk_table(header, batch, columnar, schema)
+                yield table
+
+    @staticmethod
+    def _chunk_table(header, rows, columnar, schema):
+        """Builds a converted table around a batch of raw CSV rows without copying them.
+
+        Args:
+            header(list of str): column names
+            rows(list of list of str): the raw rows of the batch
+            columnar(bool): True to store the batch as typed columns
+            schema(list of str): column types to parse with (None to infer them from this batch)
+
+        Returns:
+            MyPyTable: the converted batch
+            list of str: the schema used, to be reused for the following batches
+        """
+        table = MyPyTable(column_names=header)
+        table.data = rows
+        if columnar:
+            table.to_columnar()
+        if schema is None:
+            schema = table.infer_schema()
+        table.convert_to_numeric(schema)
+        return table, schema
+
+    def count_missing_values(self):
+        """Counts the missing values ("NA", "N/A" or empty) in each column.
+
+        Returns:
+            list of int: number of missing values per column (parallel to column_names)
+        """
+        if self._columns is not None:
+            return [int(col.mask.sum()) for col in self._columns]
+
+        counts = [0] * len(self.column_names)
+        for row in self._rows:
+            for j, value in enumerate(row):
+                if is_missing(value):
+                    counts[j] += 1
+        return counts
+
     def save_to_file(self, filename):
         """Save column names and data to a CSV file.
 
@@ -147,7 +1452,7 @@ class MyPyTable:
         with file:
             write = csv.writer(file)
             write.writerow(self.column_names)
-            write.writerows(self.data)
+            write.writerows(self._row_list())
 
     def find_duplicates(self, key_column_names):
         """Returns a list of indexes representing duplicate rows.
@@ -163,42 +1468,23 @@ class MyPyTable:
             Subsequent occurrence(s) of a row are considered the duplicate(s).
                 The first instance of a row is not considered a duplicate.
         """
-        key_indexes = []
-        for item in key_column_names:
-            index = self.column_names.index(item)
-            key_indexes.append(index)
+        index = self.get_index(key_column_names)
+        if index is None:
+            index = MyIndex(key_column_names)
+            index.build(self._row_keys([self._column_index(name) for name in key_column_names]))
 
-        unique_rows = []
-        dupe_rows = []
-        n=0
+        dupes = np.zeros(self.get_shape()[0], dtype=bool)
+        for rows in index.positions.values():
+            if len(rows) > 1:
+                dupes[rows[1:]] = True
 
-        for row in self.data:
-            i=0
-            unique_row = []
-            for item in row:
-                if i in key_indexes:
-                    unique_row.append(item)
-                else:
-                    pass
-                i+=1
-            if unique_row in unique_rows:
-                dupe_rows.append(n)
-            else:
-                unique_rows.append(unique_row)
-            n+=1
-
-        return dupe_rows
+        return np.flatnonzero(dupes).tolist()
 
     def remove_rows_with_missing_values(self):
         """Remove rows from the table data that contain a missing value ("NA").
         """
-        j=0
-        while j < len(self.data):
-            if "NA" in self.data[j] or "N/A" in self.data[j] or '' in self.data[j]:
-                clear = self.data.pop(j)
-                j-=1
-            j+=1
-                    
+        self.filter(~self.missing_mask())
+
     def replace_missing_values_with_column_average(self, col_name):
         """For columns with continuous data, fill missing values in a column
             by the column's original average.
@@ -207,13 +1493,25 @@ class MyPyTable:
             col_name(str): name of column to fill with the original average (of the column).
         """
         index = self.column_names.index(col_name)
+        if self._columns is not None:
+            col = self._columns[index]
+            if not col.is_numeric():
+                # the same error the row path gets from summing strings
+                raise TypeError("cannot average the " + col.kind + " column " + str(col_name))
+            present = col.present_values()
+            avg = round(float(present.sum())/len(present), 2)
+            filled = np.where(col.mask, avg, col.values)
+            self._columns[index] = MyColumn._numeric(filled, np.zeros(len(col), dtype=bool))
+            self._invalidate_indexes()
+            return
+
         _data = []
         
         for row in self.data:
             j = 0
             while j < len(row):
                 if j == index:
-                    if row[j] == ("NA" or ''):
+                    if is_missing(row[j]):
                         j+=1
                     else:
                         _data.append(row[j])
@@ -227,7 +1525,7 @@ class MyPyTable:
         for row in self.data:
             newRow = []
             for i in range(len(row)):
-                if row[i] == ("NA" or '') and i == index:
+                if i == index and is_missing(row[i]):
                     newRow.append(avg)
                 else:
                     newRow.append(row[i])
@@ -244,51 +1542,34 @@ class MyPyTable:
         Returns:
             MyPyTable: stores the summary stats computed. The column names and their order
                 is as follows: ["attribute", "min", "max", "mid", "avg", "median"]
+
+        Notes:
+            Missing values are skipped; columns without any value are left out.
         """
-        def median(lst):
-            n = len(lst)
-            s = sorted(lst)
-            return (s[n//2-1]/2.0+s[n//2]/2.0, s[n//2])[n % 2] if n else None
-            '''
-            retrieved median fxn from https://stackoverflow.com/questions/24101524/finding-median-of-list-in-python
-            '''
+        # imported here because mystats builds its results as MyPyTables
+        from mysklearn.mystats import MySummaryAccumulator
 
-        newMyPyTable = MyPyTable(column_names=["attribute", "min", "max", "mid", "avg", "median"], data=None)
-        
-        col_data = []
-        attributes = []
-        for item in col_names:
-            col_data.append(self.get_column(item))
-            attributes.append(item)
-
-        mins = []
-        maxs = []
-        mids = []
-        avgs = []
-        meds = []
-
-        if len(col_data[0]) != 0:
-            for row in col_data:
-                mins.append(min(row))
-                maxs.append(max(row))
-                mids.append((max(row)+min(row))/2)
-                avgs.append(round(sum(row)/len(row), 4))
-                meds.append(median(row))
-
-            finalData = []
-            for item in attributes:
-                finalData.append([item])
-
-            for i in range(len(finalData)):
-                finalData[i].append(mins[i])
-                finalData[i].append(maxs[i])
-                finalData[i].append(mids[i])
-                finalData[i].append(avgs[i])
-                finalData[i].append(meds[i])
-
-            newMyPyTable.data = finalData
-
-        return newMyPyTable
+        accumulator = MySummaryAccumulator(col_names)
+        accumulator.update(self)
+        return accumulator.result()
+
+    def describe(self, col_names, quantiles=(0.25, 0.75), approximate=False):
+        """Profiles continuous columns in a single pass over the table.
+
+        Args:
+            col_names(list of str): names of the continuous columns to profile
+            quantiles(list of float): quantiles to report besides the median
+            approximate(bool): True to estimate the median and quantiles in bounded memory
+
+        Returns:
+            MyPyTable: one row per column with count, missing, min, max, mid, avg,
+                variance, median and the requested quantiles (see MyStatsAccumulator)
+        """
+        from mysklearn.mystats import MyStatsAccumulator
+
+        accumulator = MyStatsAccumulator(col_names, quantiles, approximate)
+        accumulator.update(self)
+        return accumulator.result()
 
     def perform_inner_join(self, other_table, key_column_names):
         """Return a new MyPyTable that is this MyPyTable inner joined
@@ -301,60 +1582,40 @@ class MyPyTable:
         Returns:
             MyPyTable: the inner joined table.
         """
-        newTable_cols = []
-        for item in self.column_names:
-            newTable_cols.append(item)
-        for item in other_table.column_names:
-            if item not in newTable_cols:
-                newTable_cols.append(item)
+        return self._hash_join(other_table, key_column_names, "inner")
 
-        key_indexes_og = []
-        for item in key_column_names:
-            key_indexes_og.append(self.column_names.index(item))
+    def perform_left_outer_join(self, other_table, key_column_names):
+        """Return a new MyPyTable that is this MyPyTable left outer joined with
+            other_table based on key_column_names.
 
-        key_indexes_new = []
-        for item in key_column_names:
-            key_indexes_new.append(other_table.column_names.index(item))
+        Args:
+            other_table(MyPyTable): the second table to join this table with.
+            key_column_names(list of str): column names to use as row keys.
 
-        newTable = MyPyTable(column_names=newTable_cols, data=None)
-           
-        for row in self.data:
+        Returns:
+            MyPyTable: the left outer joined table (every row of this table is kept).
 
-            key_temp_stuff = []
-            non_key_stuff = []
-            for i in range(len(row)):
-                if i in key_indexes_og:
-                    key_temp_stuff.append(row[i])
-                if i not in key_indexes_og:
-                    non_key_stuff.append(row[i])
-
-            for row2 in other_table.data:
-                key2_temp_stuff = []
-                non_key_added_stuff = []
-                for j in range(len(row2)):
-                    if j in key_indexes_new:
-                        key2_temp_stuff.append(row2[j])
-                    if j not in key_indexes_new:
-                        non_key_added_stuff.append(row2[j])
-        
-                keys_match = True
-                for item in key2_temp_stuff:
-                    if item not in key_temp_stuff:
-                        keys_match = False
-                        break
-                
-                if len(key2_temp_stuff) != len(key_temp_stuff):
-                    keys_match = False
-                        
-                if keys_match:
-                    newEntry = []
-                    for item in row:
-                        newEntry.append(item)
-                    for item in non_key_added_stuff:
-                        newEntry.append(item)
-                    newTable.data.append(newEntry)
+        Notes:
+            Pad the attributes with missing values with "NA".
+        """
+        return self._hash_join(other_table, key_column_names, "left")
 
-        return newTable
+    def perform_right_outer_join(self, other_table, key_column_names):
+        """Return a new MyPyTable that is this MyPyTable right outer joined with
+            other_table based on key_column_names.
+
+        Args:
+            other_table(MyPyTable): the second table to join this table with.
+            key_column_names(list of str): column names to use as row keys.
+
+        Returns:
+            MyPyTable: the right outer joined table (every row of other_table is kept,
+                in other_table's order).
+
+        Notes:
+            Pad the attributes with missing values with "NA".
+        """
+        return self._hash_join(other_table, key_column_names, "right")
 
     def perform_full_outer_join(self, other_table, key_column_names):
         """Return a new MyPyTable that is this MyPyTable fully outer joined with
@@ -367,121 +1628,160 @@ class MyPyTable:
         Notes:
             Pad the attributes with missing values with "NA".
         """
-        newTable_cols = []
-        for item in self.column_names:
-            newTable_cols.append(item)
-        for item in other_table.column_names:
-            if item not in newTable_cols:
-                newTable_cols.append(item)
+        return self._hash_join(other_table, key_column_names, "outer")
 
-        key_indexes_og = []
-        for item in key_column_names:
-            key_indexes_og.append(self.column_names.index(item))
+    def _hash_join(self, other_table, key_column_names, how):
+        """Joins this table with other_table using a hash index on the smaller of the two.
 
-        key_indexes_new = []
-        for item in key_column_names:
-            key_indexes_new.append(other_table.column_names.index(item))
+        Args:
+            other_table(MyPyTable): the second table to join this table with.
+            key_column_names(list of str): column names to use as row keys.
+            how(str): "inner", "left", "right" or "outer"
 
-        newTable = MyPyTable(column_names=newTable_cols, data=None)
-        
-        for row in self.data:
-            matchFound = False
+        Returns:
+            MyPyTable: the joined table. Its columns are this table's columns followed by
+                the columns of other_table that this table does not have.
 
-            key_temp_stuff = []
-            non_key_stuff = []
-            for i in range(len(row)):
-                if i in key_indexes_og:
-                    key_temp_stuff.append(row[i])
-                if i not in key_indexes_og:
-                    non_key_stuff.append(row[i])
-
-            for row2 in other_table.data:
-                key2_temp_stuff = []
-                non_key_added_stuff = []
-                for j in range(len(row2)):
-                    if j in key_indexes_new:
-                        key2_temp_stuff.append(row2[j])
-                    if j not in key_indexes_new:
-                        non_key_added_stuff.append(row2[j])
-        
-                keys_match = True
-                for item in key2_temp_stuff:
-                    if item not in key_temp_stuff:
-                        keys_match = False
-                        break
-                
-                if len(key2_temp_stuff) != len(key_temp_stuff):
-                    keys_match = False
-
-                if keys_match:
-                    newEntry = []
-                    for item in row:
-                        newEntry.append(item)
-                    for item in non_key_added_stuff:
-                        newEntry.append(item)
-                    newTable.data.append(newEntry)
-                    matchFound = True
-
-            # left
-            if not matchFound:
-                newEntry = []
-                for item in row:
-                    newEntry.append(item)
-                for item in non_key_added_stuff:
-                    newEntry.append("NA")
-                newTable.data.append(newEntry)
-                    
-        # right
-        for row in other_table.data:
-            matchFound = False
-
-            key_temp_stuff = []
-            non_key_stuff = []
-            for i in range(len(row)):
-                if i in key_indexes_new:
-                    key_temp_stuff.append(row[i])
-                if i not in key_indexes_new:
-                    non_key_stuff.append(row[i])
-
-            for row2 in self.data:
-                key2_temp_stuff = []
-                non_key_added_stuff = []
-                for j in range(len(row2)):
-                    if j in key_indexes_og:
-                        key2_temp_stuff.append(row2[j])
-                    if j not in key_indexes_og:
-                        non_key_added_stuff.append(row2[j])
-        
-                keys_match = True
-                for item in key2_temp_stuff:
-                    if item not in key_temp_stuff:
-                        keys_match = False
-                        break
-                
-                if len(key2_temp_stuff) != len(key_temp_stuff):
-                    keys_match = False
-
-                if keys_match:
-                    matchFound = True
-
-            # right 
-            if not matchFound:
-                i=0
-                j=0
-                newEntry = []
-                for header in newTable.column_names:
-                    if header in other_table.column_names:
-                        index = other_table.column_names.index(header)
-                        val = row[index]
-                        newEntry.append(val)
-                    else:
-                        newEntry.append("NA")
-        
-                newTable.data.append(newEntry)
+        Notes:
+            Rows come out in this table's row order (other_table's order for "right"),
+                with the matches of each row in the other table's order. For "outer",
+                the unmatched rows of other_table follow in their original order.
+        """
+        left_rows = self._row_list()
+        right_rows = other_table._row_list()
+        pairs = self._join_pairs(other_table, left_rows, right_rows, key_column_names, how)
+
+        extra_indexes = [j for j, name in enumerate(other_table.column_names)
+            if name not in self.column_names]
+        # where to read this table's columns from when only the other row exists
+        fill_indexes = [other_table.column_names.index(name) if name in other_table.column_names else -1
+            for name in self.column_names]
+        left_padding = ["NA"] * len(extra_indexes)
 
+        newData = []
+        for l, r in pairs:
+            if l >= 0:
+                newEntry = list(left_rows[l])
+            else:
+                right_row = right_rows[r]
+                newEntry = [right_row[j] if j >= 0 else "NA" for j in fill_indexes]
+            if r >= 0:
+                right_row = right_rows[r]
+                newEntry.extend([right_row[j] for j in extra_indexes])
+            else:
+                newEntry.extend(left_padding)
+            newData.append(newEntry)
+
+        newTable = MyPyTable(column_names=self.column_names + [other_table.column_names[j] for j in extra_indexes])
+        newTable.data = newData
+        if self.is_columnar() and other_table.is_columnar():
+            newTable.to_columnar()
         return newTable
 
+    def _join_pairs(self, other_table, left_rows, right_rows, key_column_names, how):
+        """Matches the rows of two tables on their key columns with a hash index.
+
+        Args:
+            other_table(MyPyTable): the right table
+            left_rows(list of list of obj): rows of this table
+            right_rows(list of list of obj): rows of other_table
+            key_column_names(list of str): column names to use as row keys.
+            how(str): "inner", "left", "right" or "outer"
+
+        Returns:
+            list of (int, int): (left row index, right row index) for each output row,
+                in output order; -1 stands for the missing side of an unmatched row
+
+        Notes:
+            An index made with create_index() is used if either table has one;
+                otherwise the index is built on the smaller table and probed with the
+                larger one, so the join is linear in the size of both tables plus the output.
+        """
+        left_keys = [self.column_names.index(name) for name in key_column_names]
+        right_keys = [other_table.column_names.index(name) for name in key_column_names]
+
+        def build_index(rows, keys):
+            index = {}
+            for i, row in enumerate(rows):
+                index.setdefault(tuple([row[j] for j in keys]), []).append(i)
+            return index
+
+        # matches[i] lists the matching row indexes (ascending) of the other table for
+        # row i of the "primary" table: the left one, or the right one for a right join
+        left_primary = how != "right"
+        matches = {}
+        # reuse an index from create_index() when either table has one on these keys
+        right_index = other_table.get_index(key_column_names)
+        left_index = self.get_index(key_column_names) if right_index is None else None
+        if right_index is not None or (left_index is None and len(right_rows) <= len(left_rows)):
+            if right_index is not None:
+                index = right_index.positions
+            else:
+                index = build_index(right_rows, right_keys)
+            for l, row in enumerate(left_rows):
+                found = index.get(tuple([row[j] for j in left_keys]))
+                if found is None:
+                    continue
+                if left_primary:
+                    matches[l] = found
+                else:
+                    for r in found:
+                        matches.setdefault(r, []).append(l)
+        else:
+            if left_index is not None:
+                index = left_index.positions
+            else:
+                index = build_index(left_rows, left_keys)
+            for r, row in enumerate(right_rows):
+                found = index.get(tuple([row[j] for j in right_keys]))
+                if found is None:
+                    continue
+                if left_primary:
+                    for l in found:
+                        matches.setdefault(l, []).append(r)
+                else:
+                    matches[r] = found
+
+        pairs = []
+        if left_primary:
+            matched_right = set()
+            for l in range(len(left_rows)):
+                found = matches.get(l)
+                if found is not None:
+                    pairs.extend([(l, r) for r in found])
+                    if how == "outer":
+                        matched_right.update(found)
+                elif how != "inner":
+                    pairs.append((l, -1))
+            if how == "outer":
+                pairs.extend([(-1, r) for r in range(len(right_rows)) if r not in matched_right])
+        else:
+            for r in range(len(right_rows)):
+                found = matches.get(r)
+                if found is not None:
+                    pairs.extend([(l, r) for l in found])
+                else:
+                    pairs.append((-1, r))
+        return pairs
+
+    def groupby(self, key_column_names):
+        """Groups the rows of the table on key columns.
+
+        Args:
+            key_column_names(list of str or str): column name(s) to group on
+
+        Returns:
+            MyGroupBy: the groups; call agg(), size() or frequencies() on it, e.g.
+                table.groupby(["RUCA_3cat"]).agg({"emp_hrs": ["count", "mean"]})
+        """
+        if isinstance(key_column_names, str):
+            key_column_names = [key_column_names]
+        return MyGroupBy(self, key_column_names)
+
     def get_frequencies(self, header, col_name):
+        if self._columns is not None:
+            return self._column_frequencies(self._columns[self._column_index(col_name)])
+
         col = MyPyTable.get_column(self, col_name)
         values = []
         counts = []
@@ -502,4 +1802,41 @@ class MyPyTable:
                     counts.append(1)
         
         return values, counts # we can return multiple items
-        # packaged into a tuple
\ No newline at end of file
+        # packaged into a tuple
+
+    @staticmethod
+    def _column_frequencies(col):
+        """Counts the occurrences of each value in a column.
+
+        Args:
+            col(MyColumn): the column to count
+
+        Returns:
+            list of obj: the distinct values (sorted when comparable; "NA" last if any are missing)
+            list of int: the count of each value (parallel to values)
+        """
+        present = ~col.mask
+        if col.is_numeric():
+            uniques, counts = np.unique(col.present_values(), return_counts=True)
+            values = uniques.tolist()
+            counts = counts.tolist()
+        else:
+            if col.kind == "categorical":
+                counts = np.bincount(col.values[present], minlength=len(col.categories)).tolist()
+                pairs = [(value, count) for value, count in zip(col.categories, counts) if count > 0]
+            else:
+                tally = {}
+                for value in col.values[present].tolist():
+                    tally[value] = tally.get(value, 0) + 1
+                pairs = list(tally.items())
+            try:
+                pairs.sort(key=lambda pair: pair[0])
+            except TypeError:
+                pass
+            values = [value for value, _ in pairs]
+            counts = [count for _, count in pairs]
+        n_missing = int(col.mask.sum())
+        if n_missing:
+            values.append("NA")
+            counts.append(n_missing)
+        return values, counts
@@ -1,6 +1,257 @@
-import copy
+import multiprocessing
+from mysklearn import myutils
+import numpy as np
 from tabulate import tabulate
 
+def _popcount(bits):
+    """Counts the set bits of a non-negative int.
+    """
+    if hasattr(bits, "bit_count"):
+        return bits.bit_count()
+    return bin(bits).count("1")
+
+RULE_MINER_ALGORITHMS = ("apriori", "fpgrowth")
+
+def _itemset_rules(itemset, supports, n_tot, minconf, items):
+    """Generates the rules of one supported itemset from cached support counts.
+
+    Args:
+        itemset(list of int): the itemset, as sorted item ids
+        supports(dict of frozenset: int): support count of the itemset and all its subsets
+        n_tot(int): number of instances
+        minconf(float): minimum confidence of a rule
+        items(list of obj): the item of each id, used to decode the rules
+
+    Returns:
+        list of dict: the rules with confidence >= minconf, in the same order as the
+            original power-set enumeration
+
+    Notes:
+        Consequents grow level by level (ap-genrules): a consequent with m+1 items is
+            only tried if every m-item sub-consequent gave a rule with minconf, since
+            moving items to the right side can only lower the confidence.
+        A consequent is a bitmask over the positions in itemset. The original order
+            lists them by increasing bitmask, with the consequent's items in
+            descending position order and the antecedent's in ascending order.
+    """
+    n = len(itemset)
+    full = (1 << n) - 1
+    n_both = supports[frozenset(itemset)]
+
+    def subset(mask):
+        return [itemset[i] for i in range(n) if mask >> i & 1]
+
+    found = []
+    level = [1 << i for i in range(n)]
+    m = 1
+    while level and m < n:
+        passed = []
+        for mask in level:
+            lhs = subset(full & ~mask)
+            n_left = supports[frozenset(lhs)]
+            if n_left == 0:
+                # no confidence to compare; keep growing as the original would try them
+                passed.append(mask)
+                continue
+            conf = n_both/n_left
+            if conf >= minconf:
+                passed.append(mask)
+                rhs = subset(mask)[::-1]
+                n_right = supports[frozenset(rhs)]
+                sup = n_both/n_tot
+                lift = (n_both/n_tot) / ( (n_left/n_tot) * (n_right/n_tot) )
+                found.append((mask, {"lhs": [items[i] for i in lhs], "rhs": [items[i] for i in rhs], "support": round(sup, 2), "confidence": round(conf, 2), "lift": round(lift, 2)}))
+
+        # next consequents: unions of two passing ones whose m-subsets all passed
+        passed_set = set(passed)
+        level = set()
+        for i in range(len(passed)):
+            for j in range(i + 1, len(passed)):
+                mask = passed[i] | passed[j]
+                if mask not in level and _popcount(mask) == m + 1 and \
+                        all(mask & ~(1 << b) in passed_set for b in range(n) if mask >> b & 1):
+                    level.add(mask)
+        level = sorted(level)
+        m += 1
+
+    found.sort(key=lambda pair: pair[0])
+    return [rule for mask, rule in found]
+
+def _generate_rules(supported_itemsets, supports, n_tot, minconf, items):
+    """Generates the rules of every supported itemset, in order (see _itemset_rules()).
+    """
+    rules = []
+    # for each itemset S in supported_itemsets
+    for itemset in supported_itemsets:
+        rules.extend(_itemset_rules(itemset, supports, n_tot, minconf, items))
+    return rules
+
+def _item_attribute(item):
+    """Returns the attribute of an "att=val" item (the whole item if it has no "=").
+    """
+    return str(item).split("=", 1)[0]
+
+class MyItemEncoder:
+    """Represents a dictionary encoding of the items of a dataset as dense integer ids.
+
+    Attributes:
+        header(list of str): the attribute names, or None if the instances already hold
+            items ("att=val" strings or market-basket items)
+        items(list of obj): the distinct items in sorted order; an item's id is its position
+        ids(dict of obj: int): the id of each item
+
+    Notes:
+        With a header, value val of attribute att is the item "att=val", the string
+            myutils.prepend_equal() would write, built once per distinct value instead
+            of once per cell.
+        Ids follow the sorted order of the items, so sorted id tuples sort exactly like
+            the itemsets they stand for.
+    """
+    def __init__(self, header=None):
+        """Initializer for MyItemEncoder.
+
+        Args:
+            header(list of str): the attribute names (None if the instances hold items)
+        """
+        self.header = header
+        self.items = None
+        self.ids = None
+        self._column_ids = None
+
+    def fit(self, X):
+        """Assigns an id to every distinct item of X.
+
+        Args:
+            X(list of list of obj): the instances
+        """
+        if self.header is None:
+            distinct = set()
+            for instance in X:
+                distinct.update(instance)
+            self.items = sorted(distinct)
+            self.ids = {item: i for i, item in enumerate(self.items)}
+            return
+
+        columns = [set() for _ in self.header]
+        for instance in X:
+            for j, value in enumerate(instance):
+                columns[j].add(value)
+        names = [{value: self.header[j] + "=" + str(value) for value in column}
+            for j, column in enumerate(columns)]
+        self.items = sorted(set(item for column in names for item in column.values()))
+        self.ids = {item: i for i, item in enumerate(self.items)}
+        self._column_ids = [{value: self.ids[item] for value, item in column.items()} for column in names]
+
+    def transform(self, X):
+        """Encodes instances as transactions of item ids.
+
+        Args:
+            X(list of list of obj): the instances; every item must have been seen by fit()
+
+        Returns:
+            list of numpy.ndarray: one sorted int32 array of distinct item ids per instance
+        """
+        transactions = []
+        for instance in X:
+            if self._column_ids is None:
+                ids = set(self.ids[item] for item in instance)
+            else:
+                ids = set(self._column_ids[j][value] for j, value in enumerate(instance))
+            transactions.append(np.array(sorted(ids), dtype=np.int32))
+        return transactions
+
+    def decode(self, ids):
+        """Returns the items of a list of item ids.
+        """
+        return [self.items[i] for i in ids]
+
+class _MyFPNode:
+    """One node of a MyFPTree: an item, the weight of the paths through it, its
+        parent and its children (by item).
+    """
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+class MyFPTree:
+    """Represents a frequent-pattern tree (FP-tree) over weighted transactions.
+
+    Attributes:
+        min_count(int): smallest support count of a frequent itemset
+        counts(dict of obj: int): support count of each frequent item
+        order(list of obj): the frequent items, most frequent first (ties by item)
+        nodes(dict of obj: list of _MyFPNode): the nodes holding each item (the
+            header table)
+        root(_MyFPNode): the root (its item is None)
+
+    Notes:
+        Built in two passes over the transactions: one counting the items, one
+            inserting each transaction's frequent items, most frequent first, as a
+            path from the root (shared prefixes share nodes).
+        mine() is FP-growth: for each item it builds the conditional tree of the
+            paths leading to that item and recurses, without generating candidates.
+    """
+    def __init__(self, transactions, min_count):
+        """Initializer for MyFPTree.
+
+        Args:
+            transactions(list of tuple): (items, weight) pairs; items must not repeat
+                within a transaction
+            min_count(int): smallest support count of a frequent itemset (at least 1)
+        """
+        self.min_count = min_count
+        counts = {}
+        for items, weight in transactions:
+            for item in items:
+                counts[item] = counts.get(item, 0) + weight
+        self.counts = {item: count for item, count in counts.items() if count >= min_count}
+        self.order = sorted(self.counts, key=lambda item: (-self.counts[item], item))
+        rank = {item: i for i, item in enumerate(self.order)}
+
+        self.root = _MyFPNode(None, None)
+        self.nodes = {item: [] for item in self.order}
+        for items, weight in transactions:
+            node = self.root
+            for item in sorted((item for item in items if item in rank), key=rank.get):
+                child = node.children.get(item)
+                if child is None:
+                    child = _MyFPNode(item, node)
+                    node.children[item] = child
+                    self.nodes[item].append(child)
+                child.count += weight
+                node = child
+
+    def mine(self, suffix=()):
+        """Finds every frequent itemset of the tree.
+
+        Args:
+            suffix(tuple): items the tree is conditioned on (added to every itemset)
+
+        Returns:
+            list of tuple: (itemset, support count) pairs, itemset being a tuple of items
+        """
+        found = []
+        for item in reversed(self.order):
+            itemset = (item,) + suffix
+            found.append((itemset, self.counts[item]))
+            # conditional pattern base: the path above each node holding the item
+            base = []
+            for node in self.nodes[item]:
+                path = []
+                parent = node.parent
+                while parent.item is not None:
+                    path.append(parent.item)
+                    parent = parent.parent
+                if path:
+                    base.append((path, node.count))
+            if base:
+                found.extend(MyFPTree(base, self.min_count).mine(itemset))
+        return found
+
 class MyAssociationRuleMiner:
     """Represents an association rule miner.
 
@@ -10,12 +261,33 @@ class MyAssociationRuleMiner:
         X_train(list of list of obj): The list of training instances (samples)
                 The shape of X_train is (n_train_samples, n_features)
         rules(list of dict): The generated rules
+        algorithm(str): "apriori" or "fpgrowth"
+        n_jobs(int): number of worker processes for partitioned mining
+        partitions(int): number of chunks for partitioned mining (None: n_jobs)
+        encoder(MyItemEncoder): the item ids of X_train
+        transactions(list of numpy.ndarray): X_train as sorted arrays of item ids
+        supported_itemsets(list of list of int): the supported itemsets with at least
+            two items, as sorted item ids, by size and then in sorted order
+        supports(dict of frozenset: int): support count of every supported itemset
+            (singletons included, keyed by item ids), filled while mining; rules are
+            computed from it
+        tidsets(list of int): the vertical representation of X_train: for each item id,
+            a bitset (Python int) whose bit t is set if instance t contains the item
 
     Notes:
-        Implements the apriori algorithm
+        Implements the apriori algorithm, or FP-growth (algorithm="fpgrowth"), which
+            finds the same supported itemsets and rules without generating candidates
+        Mining runs on integer item ids (see MyItemEncoder); items are only decoded
+            into the rules
+        The support of an itemset is the popcount of the AND of its items' bitsets,
+            so X_train is only scanned once, to build tidsets; rule generation reads
+            supports and never goes back to the data
+        With partitions > 1, the chunks of X_train are mined separately (in a process
+            pool with n_jobs > 1) and the merged candidates are counted once over the
+            whole of X_train, which gives exactly the same itemsets and rules
         Terminology: instance = sample = row and attribute = feature = column
     """
-    def __init__(self, minsup=0.25, minconf=0.8):
+    def __init__(self, minsup=0.25, minconf=0.8, algorithm="apriori", n_jobs=1, partitions=None):
         """Initializer for MyAssociationRuleMiner.
 
         Args:
@@ -23,271 +295,236 @@ class MyAssociationRuleMiner:
                 (0.25 if a value is not provided and the default minsup should be used)
             minconf(float): The minimum confidence value to use when generating rules
                 (0.8 if a value is not provided and the default minconf should be used)
+            algorithm(str): "apriori" (the default) or "fpgrowth", which is much faster
+                on dense data with a low minsup (with minsup <= 0, where every
+                combination of items is supported, apriori is used either way)
+            n_jobs(int): number of worker processes mining the partitions (1 mines in
+                this process, -1 uses every core)
+            partitions(int): number of chunks X_train is split into for partitioned
+                (SON) mining; None uses n_jobs, and 1 mines X_train as a whole
         """
+        if algorithm not in RULE_MINER_ALGORITHMS:
+            raise ValueError("algorithm must be one of " + str(RULE_MINER_ALGORITHMS))
         self.minsup = minsup
         self.minconf = minconf
+        self.algorithm = algorithm
+        self.n_jobs = n_jobs
+        self.partitions = partitions
         self.X_train = None
+        self.encoder = None
+        self.transactions = None
+        self.supported_itemsets = None
+        self.supports = None
+        self.tidsets = None
 
         # IF interviewed_well=False THEN tweets=no
         # rule1 = {"lhs": ["interviewed_well=False"], "rhs": ["tweets=no"], "support": 0.69 "confidence": 0.69, "lift": 0.69}
         self.rules = None
 
-    def fit(self, X_train):
-        """Fits an association rule miner to X_train using the Apriori algorithm.
+    def fit(self, X_train, header=None):
+        """Fits an association rule miner to X_train using the Apriori (or FP-growth) algorithm.
 
         Args:
             X_train(list of list of obj): The list of training instances (samples)
                 The shape of X_train is (n_train_samples, n_features)
+            header(list of str): the attribute names, to mine the "att=val" items of a
+                table whose values were not prepended with them (see MyItemEncoder)
 
         Notes:
             Store the list of generated association rules in the rules attribute
             If X_train represents a non-market basket analysis dataset, then:
                 Attribute labels should be prepended to attribute values in X_train
-                    before fit() is called (e.g. "att=val", ...).
+                    before fit() is called (e.g. "att=val", ...), or passed as header.
                 Make sure a rule does not include the same attribute more than once
         """
-        def compute_unique_values(table):
-            unique = set()
-            for row in table:
-                for value in row: 
-                    unique.add(value)
-            return sorted(list(unique))
-
-        def compute_k_minus_1_subsets(itemset):
-            subsets = []
-            for i in range(len(itemset)):
-                subsets.append(itemset[:i] + itemset[i + 1:])
-            return subsets                    
-
         def generate_apriori_rules(supported_itemsets):
-            def numcheck(l, r):
-                num = 0
-                for instance in self.X_train:
-                    Lresult =  all(elem in instance for elem in l)
-                    if Lresult:
-                        Rresult =  all(elem in instance for elem in r)
-                        if Rresult:
-                            num+=1
-                
-                return num
-
-            def denomcheck(l):
-                denom = 0
-                for instance in self.X_train:
-                    Lresult =  all(elem in instance for elem in l)
-                    if Lresult:
-                        denom+=1
-            
-                return denom
-
-            def calculate_rstats(l, r):
-                n_left = 0
-                n_right = 0
-                n_both = 0
-                n_tot = len(self.X_train)
-            
-                for instance in self.X_train:
-                    Lresult =  all(elem in instance for elem in l)
-                    if Lresult:
-                        n_left+=1
-                        Rresult =  all(elem in instance for elem in r)
-                        if Rresult:
-                            n_right+=1
-                            n_both+=1
-                    else:
-                        Rresult =  all(elem in instance for elem in r)
-                        if Rresult:
-                            n_right+=1
-
-                # sup
-                sup = n_both/n_tot
-                # conf
-                conf = n_both/n_left
-                # lift
-                lift = (n_both/n_tot) / ( (n_left/n_tot) * (n_right/n_tot) )
+            return _generate_rules(supported_itemsets, self.supports, len(self.transactions),
+                self.minconf, self.encoder.items)
 
-                return sup, conf, lift
-
-            rules = []
-            # for each itemset S in supported_itemsets
-            for itemset in supported_itemsets:
-                temp = combs(itemset)
-                rhs_poss = []
-                for item in temp:
-                    if len(item) > 0 and len(item) < len(itemset):
-                        rhs_poss.append(item)
-                
-                lhs_poss = []
-                for r in rhs_poss:
-                    ins = []
-                    for item in itemset:
-                        if item not in r:
-                            ins.append(item)
-                    lhs_poss.append(ins)
-
-                # check confidence >= minconf => append to rules
-                conf_pass = []
-            
-                for n in range(len(rhs_poss)):
-                    num = numcheck(rhs_poss[n], lhs_poss[n])
-                    denom = denomcheck(lhs_poss[n])
-
-                    if denom == 0:
-                        pass
-                    else:
-                        conf = num/denom
-                        if conf >= self.minconf:
-                            rule_sup, rule_conf, rule_lift = calculate_rstats(lhs_poss[n], rhs_poss[n])
-                            conf_pass.append({"lhs": lhs_poss[n], "rhs": rhs_poss[n], "support": round(rule_sup, 2), "confidence": round(rule_conf, 2), "lift": round(rule_lift, 2)})
-                if conf_pass != []:
-                    for item in conf_pass:
-                        rules.append(item)
-
-            return rules 
-        
-        def combs(a):
-            if len(a) == 0:
-                return [[]]
-            cs = []
-            for c in combs(a[1:]):
-                cs += [c, c+[a[0]]]
-            return cs
-
-        def check_support(item):
-            curr = copy.deepcopy(self.X_train)
-            for a in item:
-                i=0
-                while i < len(curr):
-                    if a not in curr[i]:
-                        del curr[i]
-                        i-=1
-                    i+=1
-            return len(curr)
-
-        def generate_ck(Lkminus1, k):
-            # singleton exception
-            ck = []
-            if ',' not in str(Lkminus1[0]):
-                temp = combs(Lkminus1)
-                for item in temp:
-                    if len(item) == k:
-                        item.sort()
-                        ck.append(item)
-            else:
-                ck = []
-                for item in Lkminus1:
-                    ind = Lkminus1.index(item)
-
-                    left_elements = item[:-1]
-                    right_element = item[-1]
-
-                    for i in range(len(Lkminus1)):
-                        if i == ind:
-                            pass
-                        else:
-                            les = Lkminus1[i][:-1]
-                            re = Lkminus1[i][-1]
-
-                            les.sort()
-                            left_elements.sort()
-                            if les == left_elements:
-                                    les.append(right_element)
-                                    les.append(re)
-                                    les.sort()
-                                    if les not in ck:
-                                        ck.append(les)
+        self._mine(X_train, header)
+        self.rules = generate_apriori_rules(self.supported_itemsets)
 
+    def _mine(self, X_train, header=None):
+        """Finds supported_itemsets and supports in X_train, without generating rules.
+        """
+        self.X_train = X_train
+        self.encoder = MyItemEncoder(header)
+        self.encoder.fit(X_train)
+        self.transactions = self.encoder.transform(X_train)
+        self._build_tidsets()
+        n_jobs = myutils.resolve_n_jobs(self.n_jobs)
+        partitions = self.partitions if self.partitions is not None else n_jobs
+        partitions = max(1, min(partitions, len(X_train)))
+        if partitions > 1 and self.minsup > 0:
+            self._mine_partitioned(partitions, n_jobs)
+        else:
+            self._mine_itemsets()
+
+    def _mine_itemsets(self):
+        """Finds supported_itemsets and their supports in transactions (tidsets must be built).
+        """
+        def generate_ck(Lkminus1):
+            # Lkminus1 holds sorted tuples of item ids in sorted order, so the itemsets
+            # sharing their first k-2 ids are contiguous: join each such group pairwise
+            ck = []
+            start = 0
+            while start < len(Lkminus1):
+                prefix = Lkminus1[start][:-1]
+                end = start + 1
+                while end < len(Lkminus1) and Lkminus1[end][:-1] == prefix:
+                    end += 1
+                for i in range(start, end):
+                    for j in range(i + 1, end):
+                        ck.append(Lkminus1[i] + Lkminus1[j][-1:])
+                start = end
             return ck
 
         def apriori(table, minsup, minconf):
             supported_itemsets = []
-            # generate L1 supported itemsets of cardinality 1
-            I = compute_unique_values(table)
-
-            # check support of singletons in L1
-            singleton_percents = []
-            # generate base percents for each singleton
-            for item in I:
-                singleton_percents.append(0)
-
-            # iterate through table and get support
-            for i in range(len(I)):
-                for instance in table:
-                    if I[i] in instance:
-                        singleton_percents[i] += 1
-
-            for i in range(len(singleton_percents)):
-                singleton_percents[i] = singleton_percents[i]/len(table)
-
-            i = 0
-            while i < len(singleton_percents):
-                if singleton_percents[i] < minsup:
-                    del singleton_percents[i]
-                    del I[i]
-                    i-=1
-                i+=1
+            # generate L1 supported itemsets of cardinality 1 (the item ids, sorted
+            # like the items themselves)
+            def is_supported(itemset):
+                count = self._count_ids(itemset)
+                if count/len(table) < minsup:
+                    return False
+                self.supports[frozenset(itemset)] = count
+                return True
 
             # initialize lk
             k = 2
-            Lkminus1 = []
-            for item in I:
-                Lkminus1.append(item)
-            
+            Lkminus1 = [(i,) for i in range(len(self.tidsets)) if is_supported((i,))]
+
             # while loop... while(Lkminus1 is not empty)
             while len(Lkminus1) != 0:
-                ck = generate_ck(Lkminus1, k)
-                # ck established, start pruning
-                n = 0
-                while n < len(ck):
-                    # check if items in combos are in Lkminus1
-                    seperate_combos = compute_k_minus_1_subsets(ck[n])
-                    for combo in seperate_combos:
-                        combo.sort()
-                        if k == 2:
-                            if combo[0] not in Lkminus1:
-                                del ck[n]
-                                n-=1
-                                break
-
-                        else:
-                            if combo not in Lkminus1:
-                                del ck[n]
-                                n-=1
-                                break
-                    n+=1
-
-                # check if each item currently in ck has minsup
-                minsup_counts = []
-                for item in ck:
-                    minsup_counts.append(0)
-                for q in range(len(ck)):
-                    num = check_support(ck[q])
-                    minsup_counts[q]+=num
-                for i in range(len(minsup_counts)):
-                    minsup_counts[i] /= len(self.X_train)
-
-                i = 0
-                while i < len(minsup_counts):
-                    if minsup_counts[i] < self.minsup:
-                        del ck[i]
-                        del minsup_counts[i]
-                        i-=1
-                    i+=1
-
-                # loop finished, store ck, increase k, repeat
-                ck.sort()
-                ('ck after sort:', ck)
-                if len(ck) > 0:
-                    for item in ck:
-                        supported_itemsets.append(item)
+                ck = generate_ck(Lkminus1)
+                # prune: every (k-1)-subset of a candidate must be supported
+                # (the last two are the joined itemsets themselves)
+                previous = set(Lkminus1)
+                ck = [c for c in ck if all(c[:i] + c[i+1:] in previous for i in range(k - 2))]
+
+                # keep the candidates with minsup (ck is already sorted)
+                ck = [c for c in ck if is_supported(c)]
+                for c in ck:
+                    supported_itemsets.append(list(c))
                 Lkminus1 = ck
                 k+=1
 
-            rules = generate_apriori_rules(supported_itemsets)
-            return rules 
+            return supported_itemsets
+
+        def fpgrowth(table):
+            if len(table) == 0:
+                return []
+            tree = MyFPTree([(transaction.tolist(), 1) for transaction in table], self._min_support_count())
+            itemsets = []
+            for itemset, count in tree.mine():
+                self.supports[frozenset(itemset)] = count
+                if len(itemset) > 1:
+                    itemsets.append(sorted(itemset))
+            # same order as apriori: level by level, each level sorted
+            itemsets.sort(key=lambda itemset: (len(itemset), itemset))
+            return itemsets
+
+        self.supports = {}
+        # with minsup <= 0 even itemsets no instance contains are supported; FP-growth
+        # only sees the ones that occur, so apriori enumerates them instead
+        if self.algorithm == "fpgrowth" and self.minsup > 0:
+            self.supported_itemsets = fpgrowth(self.transactions)
+        else:
+            self.supported_itemsets = apriori(self.transactions, self.minsup, self.minconf)
+
+    def _mine_partitioned(self, partitions, n_jobs):
+        """Finds supported_itemsets and their supports with the SON algorithm.
 
-        self.X_train = X_train
-        self.rules = apriori(X_train, self.minsup, self.minconf)
+        Args:
+            partitions(int): number of contiguous chunks X_train is split into
+            n_jobs(int): number of worker processes mining the chunks
+
+        Notes:
+            An itemset with minsup in X_train has minsup in at least one chunk, so the
+                union of the locally supported itemsets holds every supported itemset.
+                The chunks are mined at a hair below minsup so float rounding cannot
+                lose one; a single counting pass over the tidsets then keeps the
+                candidates with minsup overall, with their exact supports.
+        """
+        bounds = np.linspace(0, len(self.transactions), partitions + 1).astype(int).tolist()
+        tasks = [(self.transactions[bounds[i]:bounds[i + 1]], len(self.tidsets),
+            self.minsup * (1 - 1e-9), self.algorithm) for i in range(partitions)]
+        if n_jobs > 1:
+            with multiprocessing.Pool(min(n_jobs, partitions)) as pool:
+                results = pool.map(_mine_partition, tasks)
+        else:
+            results = [_mine_partition(task) for task in tasks]
+
+        candidates = set()
+        for itemsets in results:
+            candidates.update(itemsets)
+        self.supports = {}
+        for itemset in candidates:
+            count = self._count_ids(itemset)
+            if not (count/len(self.transactions) < self.minsup):
+                self.supports[itemset] = count
+        self.supported_itemsets = sorted((sorted(itemset) for itemset in self.supports if len(itemset) > 1),
+            key=lambda itemset: (len(itemset), itemset))
+
+    def _min_support_count(self):
+        """Returns the smallest support count c with c / len(X_train) >= minsup (at least 1).
+
+        Notes:
+            Found with the same float comparison apriori uses, so both algorithms agree
+                on itemsets right at the threshold.
+        """
+        n = len(self.transactions)
+        count = max(1, int(self.minsup * n))
+        while count > 1 and not ((count - 1) / n < self.minsup):
+            count -= 1
+        while count <= n and count / n < self.minsup:
+            count += 1
+        return count
+
+    def _build_tidsets(self, n_items=None):
+        """Builds tidsets, the per-item transaction bitsets, in one pass over transactions.
+
+        Args:
+            n_items(int): number of item ids (None: every item of encoder)
+        """
+        if n_items is None:
+            n_items = len(self.encoder.items)
+        n = len(self.transactions)
+        lengths = [len(transaction) for transaction in self.transactions]
+        ids = np.concatenate(self.transactions) if n > 0 else np.empty(0, dtype=np.int32)
+        tids = np.repeat(np.arange(n), lengths)
+        # the tids of each item, contiguous and increasing
+        order = np.argsort(ids, kind="stable")
+        starts = np.searchsorted(ids[order], np.arange(n_items + 1)).tolist()
+        self.tidsets = []
+        for i in range(n_items):
+            member = np.zeros(n, dtype=bool)
+            member[tids[order[starts[i]:starts[i + 1]]]] = True
+            self.tidsets.append(int.from_bytes(np.packbits(member, bitorder="little").tobytes(), "little"))
+        self._all_rows = (1 << n) - 1
+
+    def _count_ids(self, itemset):
+        """Returns the support count of an itemset of item ids.
+        """
+        bits = self._all_rows
+        for i in itemset:
+            bits &= self.tidsets[i]
+            if not bits:
+                return 0
+        return _popcount(bits)
+
+    def support_count(self, itemset):
+        """Counts the instances of X_train containing every item of an itemset.
+
+        Args:
+            itemset(list of obj): the items
+
+        Returns:
+            int: the support count (the popcount of the AND of the items' tidsets)
+        """
+        if any(item not in self.encoder.ids for item in itemset):
+            return 0
+        return self._count_ids([self.encoder.ids[item] for item in itemset])
 
     def print_association_rules(self):
         """Prints the association rules in the format "IF val AND ... THEN val AND...", one rule on each line.
@@ -318,3 +555,112 @@ class MyAssociationRuleMiner:
             table.append([i+1, strings[i], self.rules[i]['support'], self.rules[i]['confidence'], self.rules[i]['lift']])
 
         print(tabulate(table, headers=['#', 'rule', 'support', 'confidence', 'lift']))
+
+class MyItemsetLattice:
+    """Represents the supported itemsets of a dataset, mined once and queried many times.
+
+    Attributes:
+        minsup(float): the minimum support the lattice was mined at, the lowest one
+            that can be queried
+        algorithm(str): "apriori" or "fpgrowth"
+        n_jobs(int): number of worker processes for partitioned mining
+        partitions(int): number of chunks for partitioned mining (None: n_jobs)
+        n_instances(int): number of instances mined
+        supported_itemsets(list of list of obj): the supported itemsets with at least
+            two items, in MyAssociationRuleMiner order
+        supports(dict of frozenset: int): support count of every supported itemset
+        encoder(MyItemEncoder): the item ids of the itemsets
+
+    Notes:
+        Every rule a MyAssociationRuleMiner would find with minsup >= the lattice's
+            minsup, on X_train or on any subset of its attributes, is answered by
+            filtering the lattice: an itemset's support does not depend on the other
+            columns, and all its subsets are in the lattice too.
+        Attributes are taken from "att=val" items (see myutils.prepend_equal()).
+    """
+    def __init__(self, minsup=0.25, algorithm="apriori", n_jobs=1, partitions=None):
+        """Initializer for MyItemsetLattice.
+
+        Args:
+            minsup(float): The lowest minimum support that will be queried
+            algorithm(str): "apriori" or "fpgrowth" (see MyAssociationRuleMiner)
+            n_jobs(int): number of worker processes (see MyAssociationRuleMiner)
+            partitions(int): number of chunks for partitioned mining (see MyAssociationRuleMiner)
+        """
+        if algorithm not in RULE_MINER_ALGORITHMS:
+            raise ValueError("algorithm must be one of " + str(RULE_MINER_ALGORITHMS))
+        self.minsup = minsup
+        self.algorithm = algorithm
+        self.n_jobs = n_jobs
+        self.partitions = partitions
+        self.n_instances = None
+        self.supported_itemsets = None
+        self.supports = None
+        self.encoder = None
+
+    def fit(self, X_train, header=None):
+        """Mines the supported itemsets of X_train at the lattice's minsup.
+
+        Args:
+            X_train(list of list of obj): The list of training instances (samples)
+                The shape of X_train is (n_train_samples, n_features)
+            header(list of str): the attribute names (see MyAssociationRuleMiner.fit())
+        """
+        miner = MyAssociationRuleMiner(self.minsup, algorithm=self.algorithm,
+            n_jobs=self.n_jobs, partitions=self.partitions)
+        miner._mine(X_train, header)
+        self.n_instances = len(X_train)
+        self.supported_itemsets = miner.supported_itemsets
+        self.supports = miner.supports
+        self.encoder = miner.encoder
+
+    def query(self, minsup=None, minconf=0.8, attributes=None):
+        """Finds the rules for a minsup, a minconf and optionally a subset of attributes.
+
+        Args:
+            minsup(float): The minimum support (None uses the lattice's minsup); must
+                not be below the lattice's minsup
+            minconf(float): The minimum confidence
+            attributes(list of str): The attributes rules may use (None for all of them)
+
+        Returns:
+            MyAssociationRuleMiner: a miner holding the same supported_itemsets, supports
+                and rules as one fitted with minsup and minconf on the attribute subset
+                (its X_train, transactions and tidsets are None)
+        """
+        if minsup is None:
+            minsup = self.minsup
+        if minsup < self.minsup:
+            raise ValueError("minsup is below the minsup the lattice was mined at")
+        keep = None if attributes is None else set(attributes)
+
+        def is_kept(itemset):
+            if itemset not in self.supports or self.supports[itemset]/self.n_instances < minsup:
+                return False
+            return keep is None or all(_item_attribute(self.encoder.items[i]) in keep for i in itemset)
+
+        miner = MyAssociationRuleMiner(minsup, minconf, algorithm=self.algorithm)
+        miner.encoder = self.encoder
+        miner.supports = {itemset: count for itemset, count in self.supports.items() if is_kept(itemset)}
+        miner.supported_itemsets = [itemset for itemset in self.supported_itemsets
+            if frozenset(itemset) in miner.supports]
+        miner.rules = _generate_rules(miner.supported_itemsets, miner.supports, self.n_instances,
+            minconf, self.encoder.items)
+        return miner
+
+def _mine_partition(task):
+    """Pool task: finds the itemsets supported within one chunk of the transactions.
+
+    Args:
+        task(tuple): the chunk (list of numpy.ndarray of item ids), the number of item
+            ids, its minsup and the algorithm
+
+    Returns:
+        list of frozenset: the locally supported itemsets (item ids), singletons included
+    """
+    chunk, n_items, minsup, algorithm = task
+    miner = MyAssociationRuleMiner(minsup, algorithm=algorithm)
+    miner.transactions = chunk
+    miner._build_tidsets(n_items)
+    miner._mine_itemsets()
+    return list(miner.supports)
@@ -0,0 +1,346 @@
+import numpy as np
+from mysklearn.mypytable import MyPyTable
+
+class MyFrequencyAccumulator:
+    """Accumulates value frequencies of one column over a sequence of tables.
+
+    Attributes:
+        col_name(str): name of the column to count
+        counts(dict of obj: int): running count of each value seen so far
+
+    Notes:
+        Feed it the chunks from MyPyTable.iter_chunks() to count a file that does
+            not fit in memory.
+    """
+    def __init__(self, col_name):
+        """Initializer for MyFrequencyAccumulator.
+
+        Args:
+            col_name(str): name of the column to count
+        """
+        self.col_name = col_name
+        self.counts = {}
+
+    def update(self, table):
+        """Adds the values of one table (or chunk) to the running counts.
+
+        Args:
+            table(MyPyTable): a table containing col_name
+        """
+        values, counts = table.get_frequencies(None, self.col_name)
+        for value, count in zip(values, counts):
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def result(self):
+        """Returns the accumulated frequencies.
+
+        Returns:
+            list of obj: the distinct values (sorted when comparable)
+            list of int: the count of each value (parallel to values)
+        """
+        values = list(self.counts)
+        try:
+            values.sort()
+        except TypeError:
+            pass
+        return values, [self.counts[value] for value in values]
+
+class MyMissingValueAccumulator:
+    """Accumulates per-column missing-value counts over a sequence of tables.
+
+    Attributes:
+        column_names(list of str): column names of the tables seen
+        counts(list of int): running number of missing values per column
+        n_rows(int): running number of rows seen
+    """
+    def __init__(self):
+        """Initializer for MyMissingValueAccumulator.
+        """
+        self.column_names = None
+        self.counts = None
+        self.n_rows = 0
+
+    def update(self, table):
+        """Adds the missing values of one table (or chunk) to the running counts.
+
+        Args:
+            table(MyPyTable): the next table; must have the same columns as the previous ones
+        """
+        counts = table.count_missing_values()
+        if self.counts is None:
+            self.column_names = list(table.column_names)
+            self.counts = counts
+        else:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.n_rows += table.get_shape()[0]
+
+    def result(self):
+        """Returns the accumulated missing-value counts.
+
+        Returns:
+            MyPyTable: one row per column, with columns ["attribute", "missing", "n"]
+        """
+        data = []
+        if self.counts is not None:
+            for name, count in zip(self.column_names, self.counts):
+                data.append([name, count, self.n_rows])
+        table = MyPyTable(column_names=["attribute", "missing", "n"])
+        table.data = data
+        return table
+
+class MyQuantileSketch:
+    """Represents a bounded-memory sketch for approximate quantiles of a stream of numbers.
+
+    Attributes:
+        k(int): capacity of each level; larger values are more accurate
+        levels(list of numpy.ndarray): retained values, where an item on level h stands
+            for 2**h values of the stream
+        n(int): number of values seen
+
+    Notes:
+        A KLL-style compactor: when a level overflows it is sorted and every other
+            value (alternating between the even and the odd ones) is promoted to the
+            next level. Memory is O(k log(n/k)) and the rank error is about 1/k.
+    """
+    def __init__(self, k=200):
+        """Initializer for MyQuantileSketch.
+
+        Args:
+            k(int): capacity of each level (at least 2)
+        """
+        self.k = max(2, int(k))
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.n = 0
+        self._offset = 0
+
+    def update(self, values):
+        """Adds values to the sketch.
+
+        Args:
+            values(numpy.ndarray): float values to add
+        """
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                # an odd item stays behind so the total weight is preserved exactly
+                stay = level[:len(level) % 2]
+                paired = level[len(level) % 2:]
+                promoted = paired[self._offset::2]
+                self._offset = 1 - self._offset
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = stay
+            h += 1
+
+    def quantile(self, q):
+        """Estimates a quantile of the values seen.
+
+        Args:
+            q(float): the quantile, between 0 and 1
+
+        Returns:
+            float: a retained value whose estimated rank is closest to q (None if empty)
+        """
+        if self.n == 0:
+            return None
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2**h, dtype=np.float64)
+            for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(values[order][min(position, len(values) - 1)])
+
+class MyStatsAccumulator:
+    """Computes profile statistics for many continuous columns in one pass over the data.
+
+    Attributes:
+        col_names(list of str): names of the continuous columns to profile
+        quantiles(list of float): quantiles to report besides the median
+        approximate(bool): True to estimate the median and quantiles with a
+            MyQuantileSketch per column instead of keeping every value
+        counts(list of int): non-missing values seen per column
+        missing(list of int): missing values seen per column
+        mins(list of float): running minimum per column
+        maxs(list of float): running maximum per column
+        sums(list of float): running sum per column
+        means(list of float): running mean per column
+        m2s(list of float): running sum of squared deviations from the mean per column
+
+    Notes:
+        Feed it in-memory tables or the chunks from MyPyTable.iter_chunks(). Each update
+            reads every column once and merges its moments into the running totals
+            (Chan et al.'s parallel update), so the result does not depend on chunking.
+        The exact mode keeps every non-missing value (as float64) for the quantiles;
+            the approximate mode keeps O(sketch_size log n) values per column.
+    """
+    def __init__(self, col_names, quantiles=(0.25, 0.75), approximate=False, sketch_size=200):
+        """Initializer for MyStatsAccumulator.
+
+        Args:
+            col_names(list of str): names of the continuous columns to profile
+            quantiles(list of float): quantiles to report besides the median
+            approximate(bool): True for bounded-memory approximate quantiles
+            sketch_size(int): per-level capacity of the quantile sketches
+        """
+        self.col_names = list(col_names)
+        self.quantiles = list(quantiles)
+        self.approximate = approximate
+        n_cols = len(self.col_names)
+        self.counts = [0] * n_cols
+        self.missing = [0] * n_cols
+        self.mins = [None] * n_cols
+        self.maxs = [None] * n_cols
+        self.sums = [0.0] * n_cols
+        self.means = [0.0] * n_cols
+        self.m2s = [0.0] * n_cols
+        if approximate:
+            self._sketches = [MyQuantileSketch(sketch_size) for _ in self.col_names]
+        else:
+            self._values = [[] for _ in self.col_names]
+
+    def update(self, table):
+        """Adds the values of one table (or chunk) to the running statistics.
+
+        Args:
+            table(MyPyTable): a table containing every column in col_names
+        """
+        n_rows = table.get_shape()[0]
+        for i, name in enumerate(self.col_names):
+            if table.is_columnar():
+                col = table.get_column_view(name)
+                if not col.is_numeric():
+                    # e.g. a chunk inferred as categorical because of one stray string;
+                    # fail like the row path instead of averaging the category codes
+                    stray = [value for value in col.to_list(include_missing_values=False)
+                        if not isinstance(value, (int, float))]
+                    raise ValueError("could not convert string to float: " + repr(stray[0] if stray else name))
+                values = col.present_values()
+            else:
+                values = np.asarray(table.get_column(name, include_missing_values=False), dtype=np.float64)
+            n = len(values)
+            self.missing[i] += n_rows - n
+            if n == 0:
+                continue
+
+            _min = float(values.min())
+            _max = float(values.max())
+            total = float(values.sum())
+            mean = total / n
+            m2 = float(np.square(values - mean).sum())
+
+            self.mins[i] = _min if self.mins[i] is None else min(self.mins[i], _min)
+            self.maxs[i] = _max if self.maxs[i] is None else max(self.maxs[i], _max)
+            n_before = self.counts[i]
+            n_after = n_before + n
+            delta = mean - self.means[i]
+            self.means[i] += delta * n / n_after
+            self.m2s[i] += m2 + delta * delta * n_before * n / n_after
+            self.sums[i] += total
+            self.counts[i] = n_after
+
+            if self.approximate:
+                self._sketches[i].update(values)
+            else:
+                self._values[i].append(np.array(values, dtype=np.float64))
+
+    def variance(self, i):
+        """Returns the sample variance of column i (None with fewer than 2 values).
+        """
+        if self.counts[i] < 2:
+            return None
+        return self.m2s[i] / (self.counts[i] - 1)
+
+    def quantile(self, i, q):
+        """Returns quantile q of column i (None if the column has no values).
+
+        Notes:
+            The exact mode interpolates linearly between the closest ranks, so q=0.5
+                is the usual median.
+        """
+        if self.counts[i] == 0:
+            return None
+        if self.approximate:
+            return self._sketches[i].quantile(q)
+        if len(self._values[i]) > 1:
+            self._values[i] = [np.concatenate(self._values[i])]
+        return float(np.quantile(self._values[i][0], q))
+
+    def result(self):
+        """Returns the accumulated statistics.
+
+        Returns:
+            MyPyTable: one row per column. The column names and their order is as follows:
+                ["attribute", "count", "missing", "min", "max", "mid", "avg", "variance",
+                "median"] followed by one "q<quantile>" column per extra quantile
+        """
+        header = ["attribute", "count", "missing", "min", "max", "mid", "avg", "variance", "median"]
+        header += ["q" + str(q) for q in self.quantiles]
+        data = []
+        for i, name in enumerate(self.col_names):
+            if self.counts[i] == 0:
+                row = [name, 0, self.missing[i]] + [None] * (len(header) - 3)
+            else:
+                row = [name, self.counts[i], self.missing[i], self.mins[i], self.maxs[i],
+                    (self.maxs[i]+self.mins[i])/2, self.sums[i]/self.counts[i], self.variance(i),
+                    self.quantile(i, 0.5)]
+                row += [self.quantile(i, q) for q in self.quantiles]
+            data.append(row)
+        table = MyPyTable(column_names=header)
+        table.data = data
+        return table
+
+class MySummaryAccumulator:
+    """Accumulates the summary statistics of continuous columns over a sequence of tables.
+
+    Attributes:
+        col_names(list of str): names of the continuous columns to summarize
+        stats(MyStatsAccumulator): the single-pass engine doing the work
+
+    Notes:
+        Produces the same table as MyPyTable.compute_summary_statistics().
+        Missing values are skipped.
+    """
+    def __init__(self, col_names, approximate=False):
+        """Initializer for MySummaryAccumulator.
+
+        Args:
+            col_names(list of str): names of the continuous columns to summarize
+            approximate(bool): True to estimate the median in bounded memory
+        """
+        self.col_names = list(col_names)
+        self.stats = MyStatsAccumulator(col_names, quantiles=(), approximate=approximate)
+
+    def update(self, table):
+        """Adds the values of one table (or chunk) to the running statistics.
+
+        Args:
+            table(MyPyTable): a table containing every column in col_names
+        """
+        self.stats.update(table)
+
+    def result(self):
+        """Returns the accumulated summary statistics.
+
+        Returns:
+            MyPyTable: stores the summary stats computed. The column names and their order
+                is as follows: ["attribute", "min", "max", "mid", "avg", "median"]
+
+        Notes:
+            Columns without any non-missing value are left out.
+        """
+        stats = self.stats
+        data = []
+        for i, name in enumerate(self.col_names):
+            if stats.counts[i] == 0:
+                continue
+            data.append([name, stats.mins[i], stats.maxs[i], (stats.maxs[i]+stats.mins[i])/2,
+                round(stats.sums[i]/stats.counts[i], 4), stats.quantile(i, 0.5)])
+        table = MyPyTable(column_names=["attribute", "min", "max", "mid", "avg", "median"])
+        table.data = data
+        return table
@@ -1,3 +1,4 @@
+import os
 import random
 import numpy as np
 
@@ -21,12 +22,15 @@ def randomize_in_place(alist, seed, parallel_list=None):
 def groupby(X,y):
     X_group = [] # list of list of ints (indexes)
     y_group = [] # 1D list 
+    group_of = {} # label -> position in y_group
     for i in range(len(y)):
-        if y[i] not in y_group:
+        g = group_of.get(y[i])
+        if g is None:
+            group_of[y[i]] = len(y_group)
             y_group.append(y[i])
             X_group.append([i])
         else:
-            X_group[y_group.index(y[i])].append(i)
+            X_group[g].append(i)
         
     return X_group, y_group
 
@@ -63,6 +67,59 @@ def euclidean_distance(v1, v2):
     sum = sum ** (1/2)
     return sum
 
+def squared_distances(X_train, X_test):
+    """Computes the squared euclidean distance between every test and train instance.
+
+    Args:
+        X_train(numpy.ndarray): float training instances, shape (n_train, n_features)
+        X_test(numpy.ndarray): float test instances, shape (n_test, n_features)
+
+    Returns:
+        numpy.ndarray: squared distances, shape (n_test, n_train)
+
+    Notes:
+        The squared differences are added feature by feature, in the same order as
+            euclidean_distance(), so integer-valued data gives exactly the same sums.
+    """
+    sums = np.zeros((len(X_test), len(X_train)))
+    for j in range(X_train.shape[1]):
+        diff = X_test[:, j, None] - X_train[None, :, j]
+        diff *= diff
+        sums += diff
+    return sums
+
+def is_integral(X, limit=2**20):
+    """Checks whether an array only holds whole numbers of bounded magnitude.
+
+    Args:
+        X(numpy.ndarray): the array to check
+        limit(float): largest magnitude allowed
+
+    Returns:
+        bool: True if every value is a whole number no larger than limit, so sums of
+            squared differences are computed exactly in float64
+    """
+    return bool(np.all(np.floor(X) == X) and np.all(np.abs(X) <= limit))
+
+def resolve_n_jobs(n_jobs, n_tasks=None):
+    """Turns an n_jobs argument into a number of worker processes.
+
+    Args:
+        n_jobs(int): number of processes (None or 1 for this process only, -1 for
+            every core, -2 for all but one, ...)
+        n_tasks(int): number of tasks to spread over the processes (None for no cap)
+
+    Returns:
+        int: the number of processes, at least 1 and at most n_tasks
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    if n_tasks is not None:
+        n_jobs = min(n_jobs, n_tasks)
+    return max(1, n_jobs)
+
 def get_frequencies(y_vals):
     y_vals.sort() 
     
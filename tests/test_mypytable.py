@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pytest
+from mysklearn.mypytable import MyPyTable
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_replace_missing_values_with_column_average_rejects_text(columnar):
+    table = MyPyTable(["a"], [["x"], ["NA"], ["y"], ["x"]], columnar=columnar)
+
+    with pytest.raises(TypeError):
+        table.replace_missing_values_with_column_average("a")
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_replace_missing_values_with_column_average(columnar):
+    table = MyPyTable(["a"], [[1.0], ["NA"], [2.0]], columnar=columnar)
+    table.replace_missing_values_with_column_average("a")
+
+    assert table.data == [[1.0], [1.5], [2.0]]
+
+def test_present_values_rejects_categorical():
+    table = MyPyTable(["a"], [["x"], ["NA"], ["y"]], columnar=True)
+
+    with pytest.raises(ValueError):
+        table.get_column_view("a").present_values()
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_groupby_agg_group_with_all_missing_values(columnar):
+    table = MyPyTable(["k", "v"], [["a", 1.0], ["a", 3.0], ["b", "NA"], ["b", "NA"]], columnar=columnar)
+    result = table.groupby(["k"]).agg({"v": ["count", "distinct", "sum", "mean", "min", "max"]})
+
+    assert result.column_names == ["k", "v_count", "v_distinct", "v_sum", "v_mean", "v_min", "v_max"]
+    assert result.data == [["a", 2, 2, 4.0, 2.0, 1.0, 3.0], ["b", 0, 0, "NA", "NA", "NA", "NA"]]
+
+def test_save_binary_numpy_categories_round_trip(tmp_path):
+    table = MyPyTable(["a"], [["x"], [np.int64(3)], ["x"], [np.int64(3)], ["NA"]], columnar=True)
+    table.save_binary(str(tmp_path / "t"))
+
+    loaded = MyPyTable().load_binary(str(tmp_path / "t"))
+    assert loaded.data == [["x"], [3], ["x"], [3], ["NA"]]
+
+def test_save_binary_failure_writes_nothing(tmp_path):
+    table = MyPyTable(["a", "b"], [[1, ("x",)], [2, ("x",)], [3, ("x",)]], columnar=True)
+
+    with pytest.raises(ValueError):
+        table.save_binary(str(tmp_path / "t"))
+    assert not os.path.exists(str(tmp_path / "t"))
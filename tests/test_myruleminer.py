@@ -0,0 +1,54 @@
+import os
+import pytest
+from mysklearn import myutils
+from mysklearn.mypytable import MyPyTable
+from mysklearn.myruleminer import MyAssociationRuleMiner
+
+CHRIL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "CHRILexcel.csv")
+
+@pytest.fixture(scope="module")
+def chril():
+    chri = MyPyTable().load_from_file(CHRIL_PATH)
+    # remove index col
+    for row in chri.data:
+        del row[0]
+    del chri.column_names[0]
+    myutils.prepend_equal(chri.data, chri.column_names)
+    return chri
+
+def fit_both(X, minsup, minconf):
+    miners = []
+    for algorithm in ("apriori", "fpgrowth"):
+        miner = MyAssociationRuleMiner(minsup, minconf, algorithm=algorithm)
+        miner.fit(X)
+        miners.append(miner)
+    return miners
+
+@pytest.mark.parametrize("cols", [[1, 2, 3, 4], [1, 5], [1, 6, 7], [1, 11, 12], [1, 13, 14],
+    [1, 15, 16], list(range(1, 15))])
+@pytest.mark.parametrize("minsup, minconf", [(0.75, 0.9), (0.5, 0.8), (0.3, 0.6), (0.1, 1.0)])
+def test_fpgrowth_matches_apriori_chril(chril, cols, minsup, minconf):
+    X = myutils.select_features(chril.data, cols)
+    apriori, fpgrowth = fit_both(X, minsup, minconf)
+
+    assert fpgrowth.supported_itemsets == apriori.supported_itemsets
+    assert fpgrowth.supports == apriori.supports
+    assert fpgrowth.rules == apriori.rules
+
+def test_fpgrowth_matches_apriori_all_columns(chril):
+    apriori, fpgrowth = fit_both(chril.data, 0.75, 0.9)
+
+    assert len(apriori.rules) > 0
+    assert fpgrowth.supported_itemsets == apriori.supported_itemsets
+    assert fpgrowth.supports == apriori.supports
+    assert fpgrowth.rules == apriori.rules
+
+def test_fpgrowth_matches_apriori_zero_minsup():
+    # itemsets no instance contains are supported too with minsup = 0
+    X = [["a=1", "b=1"], ["a=2", "b=1"], ["a=1", "b=2"]]
+    apriori, fpgrowth = fit_both(X, 0, 0.5)
+
+    assert frozenset([0, 1, 2, 3]) in apriori.supports
+    assert fpgrowth.supported_itemsets == apriori.supported_itemsets
+    assert fpgrowth.supports == apriori.supports
+    assert fpgrowth.rules == apriori.rules
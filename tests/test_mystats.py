@@ -0,0 +1,37 @@
+import pytest
+from mysklearn.mypytable import MyPyTable
+from mysklearn.mystats import MyStatsAccumulator
+
+@pytest.fixture
+def mixed_csv(tmp_path):
+    # with chunk_rows=3 the third chunk is "oops", 100: inferred as categorical
+    path = tmp_path / "mixed.csv"
+    path.write_text("x\n1\n2\n3\n4\n5\n6\noops\n100\n")
+    return str(path)
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_stats_reject_mixed_type_chunk(mixed_csv, columnar):
+    accumulator = MyStatsAccumulator(["x"])
+
+    with pytest.raises(ValueError, match="oops"):
+        for chunk in MyPyTable.iter_chunks(mixed_csv, chunk_rows=3, columnar=columnar):
+            accumulator.update(chunk)
+
+def test_describe_rejects_categorical_column():
+    table = MyPyTable(["x"], [[1], ["oops"], [100]], columnar=True)
+
+    with pytest.raises(ValueError):
+        table.describe(["x"])
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_stats_numeric_chunks(tmp_path, columnar):
+    path = tmp_path / "numbers.csv"
+    path.write_text("x\n1\n2\nNA\n4\n5\n6\n")
+    accumulator = MyStatsAccumulator(["x"])
+    for chunk in MyPyTable.iter_chunks(str(path), chunk_rows=3, columnar=columnar):
+        accumulator.update(chunk)
+
+    assert accumulator.counts == [5]
+    assert accumulator.missing == [1]
+    assert accumulator.mins == [1.0]
+    assert accumulator.maxs == [6.0]